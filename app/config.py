@@ -1,16 +1,123 @@
 # app/config.py
-from langchain_google_genai import ChatGoogleGenerativeAI
-from pydantic import SecretStr
 import os
+from typing import List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Retrieve the API key from environment variables
-api_key_str = os.getenv('GEMINI_API_KEY', "")
-if not api_key_str:
-    raise ValueError("GEMINI_API_KEY not found. Please set it in your .env file or environment variables.")
 
-google_api_key = SecretStr(api_key_str)
-llm = ChatGoogleGenerativeAI(model="gemini-pro", api_key=google_api_key)
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name, "").strip()
+    return int(value) if value and int(value) > 0 else None
+
+
+def env_list(name: str) -> Optional[List[str]]:
+    """A "|"-separated setting, e.g. stop sequences; None when unset."""
+    values = [value for value in os.getenv(name, "").split("|") if value]
+    return values or None
+
+
+# Chat model backend: "gemini" (needs GEMINI_API_KEY) or "fake", an offline stand-in for tests and benchmarks
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+# Seconds the fake backend spends on each call
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0"))
+# Build the models in a background thread at startup rather than on the first request
+LLM_PRELOAD = env_flag("LLM_PRELOAD", True)
+
+# Outbound Gemini quota shared by every LLM call; off (0) unless set to the account's quota.
+# Background pool refills queue alongside interactive calls, so leave headroom above the expected load.
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "0"))
+LLM_RATE_LIMIT_BURST = float(os.getenv("LLM_RATE_LIMIT_BURST", "1"))
+# Longest a call may queue for quota before the API answers 429, and how many calls may queue
+LLM_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", "10"))
+LLM_RATE_LIMIT_MAX_QUEUE = int(os.getenv("LLM_RATE_LIMIT_MAX_QUEUE", "100"))
+
+# Client-side retries per attempt; hedging and the circuit breaker handle slow or failing calls
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+# Model and generation settings per task; grading defaults to the generation model
+GENERATION_MODEL = os.getenv("GENERATION_MODEL", "gemini-pro")
+GENERATION_TEMPERATURE = float(os.getenv("GENERATION_TEMPERATURE", "0.7"))
+GENERATION_MAX_OUTPUT_TOKENS = env_optional_int("GENERATION_MAX_OUTPUT_TOKENS")
+GENERATION_STOP = env_list("GENERATION_STOP")
+GRADING_MODEL = os.getenv("GRADING_MODEL", "") or GENERATION_MODEL
+GRADING_TEMPERATURE = float(os.getenv("GRADING_TEMPERATURE", "0"))
+GRADING_MAX_OUTPUT_TOKENS = env_optional_int("GRADING_MAX_OUTPUT_TOKENS")
+GRADING_STOP = env_list("GRADING_STOP")
+
+# Session store settings
+SESSION_SHARDS = int(os.getenv("SESSION_SHARDS", "64"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "50000"))
+
+# Maximum number of answers graded concurrently for one interview
+GRADING_CONCURRENCY = int(os.getenv("GRADING_CONCURRENCY", "10"))
+
+# "per_item" sends one grading call per answer; "batched" grades every answer in a single call
+GRADING_MODE = os.getenv("GRADING_MODE", "per_item")
+
+# Grade each answer in the background as it arrives. Off by default in batched mode,
+# where it would trade the single grading call for one call per answer.
+BACKGROUND_GRADING = env_flag("BACKGROUND_GRADING", GRADING_MODE != "batched")
+
+# Default for speculatively generating question N+1 while question N is being answered
+PREFETCH_QUESTIONS = env_flag("PREFETCH_QUESTIONS", False)
+
+# Warm pool of pre-generated questions per (job_title, experience)
+QUESTION_POOL_ENABLED = env_flag("QUESTION_POOL_ENABLED", True)
+QUESTION_POOL_LOW_WATERMARK = int(os.getenv("QUESTION_POOL_LOW_WATERMARK", "2"))
+QUESTION_POOL_HIGH_WATERMARK = int(os.getenv("QUESTION_POOL_HIGH_WATERMARK", "8"))
+QUESTION_POOL_MAX_KEYS = int(os.getenv("QUESTION_POOL_MAX_KEYS", "256"))
+QUESTION_POOL_REFILL_CONCURRENCY = int(os.getenv("QUESTION_POOL_REFILL_CONCURRENCY", "4"))
+# Keys to fill at startup, e.g. "Backend Developer:junior;Data Scientist:senior"
+QUESTION_POOL_PREWARM = os.getenv("QUESTION_POOL_PREWARM", "")
+
+# Durable question bank (SQLite); set QUESTION_BANK_PATH to an empty string to disable it
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "question_bank.sqlite3")
+QUESTION_BANK_MMAP_SIZE = int(os.getenv("QUESTION_BANK_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Estimated Jaccard similarity above which two questions count as the same question
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+# Also drop near-duplicates when refilling the warm question pool
+QUESTION_POOL_DEDUP = env_flag("QUESTION_POOL_DEDUP", True)
+
+# Questions requested per generation call; extras are buffered on the session (1 disables batching)
+QUESTIONS_PER_CALL = int(os.getenv("QUESTIONS_PER_CALL", "1"))
+
+# Tiered LLM response cache (memory LRU in front of SQLite); set LLM_CACHE_PATH empty for memory only
+LLM_CACHE_ENABLED = env_flag("LLM_CACHE_ENABLED", True)
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "4096"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "200000"))
+
+# Verdicts shared across candidates, keyed on question and normalized answer (0 disables the cache)
+GRADING_CACHE_MAX_ENTRIES = int(os.getenv("GRADING_CACHE_MAX_ENTRIES", "50000"))
+
+# Let concurrent identical LLM calls share one in-flight request
+LLM_COALESCING = env_flag("LLM_COALESCING", True)
+
+# Send a duplicate of an LLM call once it outlasts this latency percentile (LLM_MAX_HEDGES=0 disables)
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_MAX_HEDGES = int(os.getenv("LLM_MAX_HEDGES", "1"))
+# Consecutive LLM failures that open the circuit, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# Default time budget per request, overridable by the client's X-Request-Timeout header (in seconds)
+QUESTION_DEADLINE_SECONDS = float(os.getenv("QUESTION_DEADLINE_SECONDS", "30"))
+FEEDBACK_DEADLINE_SECONDS = float(os.getenv("FEEDBACK_DEADLINE_SECONDS", "60"))
+REQUEST_DEADLINE_MAX_SECONDS = float(os.getenv("REQUEST_DEADLINE_MAX_SECONDS", "120"))
+
+# Serve a stored question instead once live generation has taken this long (0 always waits)
+GENERATION_LATENCY_BUDGET_SECONDS = float(os.getenv("GENERATION_LATENCY_BUDGET_SECONDS", "8"))
+# Curated questions for when neither the pool nor the bank has one (JSON list of MCQs)
+FALLBACK_QUESTIONS_PATH = os.getenv("FALLBACK_QUESTIONS_PATH", "fallback_questions.json")
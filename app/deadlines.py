@@ -0,0 +1,58 @@
+# app/deadlines.py
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Optional
+
+from app.metrics import metrics
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before its work is done."""
+
+
+class Deadline:
+    """Point in time by which a request must be answered, measured on the monotonic clock."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self) -> None:
+        if self.expired():
+            metrics.increment("deadline_exceeded")
+            raise DeadlineExceeded("Request deadline exceeded.")
+
+
+def parse_timeout(value: Optional[str], default: float, maximum: float) -> float:
+    """Seconds allowed for a request: the client's value if it sent a valid one, capped at maximum."""
+    try:
+        seconds = float(value) if value else default
+    except ValueError:
+        seconds = default
+    # NaN would pass the sign check and expire the deadline at once
+    if not math.isfinite(seconds) or seconds <= 0:
+        seconds = default
+    return min(seconds, maximum)
+
+
+async def within(deadline: Optional[Deadline], awaitable: Awaitable[Any]) -> Any:
+    """Await `awaitable`, cancelling it and raising DeadlineExceeded once the deadline passes."""
+    if deadline is None:
+        return await awaitable
+    if deadline.expired():
+        # Close the coroutine so it does not warn about never being awaited
+        close = getattr(awaitable, "close", None)
+        if close is not None:
+            close()
+        deadline.check()
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining())
+    except asyncio.TimeoutError:
+        metrics.increment("deadline_exceeded")
+        raise DeadlineExceeded("Request deadline exceeded.") from None
@@ -0,0 +1,98 @@
+# app/dedup.py
+import random
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """Hashed word n-grams of the normalized text; case, punctuation and spacing are ignored."""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8"))
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+class MinHasher:
+    """Fixed family of hash permutations producing MinHash signatures."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._coefficients: List[Tuple[int, int]] = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashed = shingles(text, self.shingle_size)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashed)
+            for a, b in self._coefficients
+        )
+
+
+def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures from the same MinHasher."""
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left) if left else 0.0
+
+
+_default_hasher = MinHasher()
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index answering "have we seen something this similar?".
+
+    Signatures are split into bands; only texts sharing at least one band bucket are
+    compared, so lookups stay cheap as the index grows.
+    """
+
+    def __init__(self, threshold: float = 0.8, bands: int = 16, hasher: MinHasher = _default_hasher):
+        if hasher.num_perm % bands:
+            raise ValueError("The number of MinHash permutations must be divisible by the number of bands.")
+        self.threshold = threshold
+        self.bands = bands
+        self._rows = hasher.num_perm // bands
+        self._hasher = hasher
+        self._signatures: List[Tuple[int, ...]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self._rows:(band + 1) * self._rows]
+
+    def _matches(self, signature: Tuple[int, ...]) -> bool:
+        seen: Set[int] = set()
+        for key in self._band_keys(signature):
+            for position in self._buckets.get(key, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                if similarity(signature, self._signatures[position]) >= self.threshold:
+                    return True
+        return False
+
+    def contains_similar(self, text: str) -> bool:
+        return self._matches(self._hasher.signature(text))
+
+    def add(self, text: str) -> bool:
+        """Index the text; returns False (without indexing) if a near duplicate is already present."""
+        signature = self._hasher.signature(text)
+        if self._matches(signature):
+            return False
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        for key in self._band_keys(signature):
+            self._buckets[key].append(position)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._signatures)
@@ -0,0 +1,129 @@
+# app/fake_llm.py
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+_WORDS = (
+    "caching indexing sharding replication logging tracing retries timeouts queues batching pagination "
+    "hashing encryption signing tokens sessions cookies migrations rollbacks deployments canaries "
+    "profiling benchmarks fixtures mocks contracts schemas validation serialization compression "
+    "streaming backpressure throttling locking transactions isolation snapshots checkpoints "
+    "partitioning compaction vacuuming prefetching memoization pooling"
+).split()
+_ITEM = re.compile(r"^Item \d+$", re.MULTILINE)
+_COUNT = re.compile(r"Generate (\d+) distinct")
+_ROLE = re.compile(r"for an? (.+?) professional applying for the position of '(.+?)'")
+
+
+class FakeChatModel(BaseChatModel):
+    """Offline stand-in for the Gemini chat model, for tests, benchmarks and running without a key.
+
+    Answers the app's prompts with made-up but well-formed content: unique multiple-choice
+    questions, and verdicts derived from a hash of the prompt. Structured output works through
+    tool calls like a real provider, streaming yields word chunks, and `latency` seconds are
+    spent per call so timing behaviour can be exercised.
+    """
+
+    latency: float = 0.0
+    seed: int = 0
+
+    _counter: Any = PrivateAttr(default_factory=itertools.count)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-interviewer"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"latency": self.latency, "seed": self.seed}
+
+    def bind_tools(self, tools: List[Any], *, tool_choice: Any = None, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _question(self, prompt: str) -> Dict[str, Any]:
+        rng = random.Random(f"{self.seed}:{next(self._counter)}")
+        first, second, third = rng.sample(_WORDS, 3)
+        role = _ROLE.search(prompt)
+        subject = f"a {role.group(2)}" if role else "an engineer"
+        return {
+            "stem": f"How should {subject} weigh {first} against {second} when {third} matters most?",
+            "options": [f"Favor {first}", f"Favor {second}", f"Rely on {third} alone", "Avoid all three"],
+            "answer_key": rng.choice("ABCD"),
+        }
+
+    def _verdict(self, prompt: str, index: int = 0) -> Dict[str, Any]:
+        digest = hashlib.sha256(f"{index}:{prompt}".encode("utf-8")).digest()
+        return {
+            "index": index,
+            "is_correct": digest[0] % 2 == 0,
+            "correct_answer": "ABCD"[digest[1] % 4],
+            "explanation": "Graded by the offline model.",
+        }
+
+    def _arguments(self, tool: str, prompt: str) -> Dict[str, Any]:
+        if tool == "MCQItem":
+            return self._question(prompt)
+        if tool == "GeneratedQuestions":
+            count = _COUNT.search(prompt)
+            return {"questions": [self._question(prompt) for _ in range(int(count.group(1)) if count else 1)]}
+        if tool == "AnswerVerdict":
+            return self._verdict(prompt)
+        if tool == "GradingReport":
+            return {"verdicts": [self._verdict(prompt, index) for index in range(len(_ITEM.findall(prompt)))]}
+        raise ValueError(f"FakeChatModel cannot produce {tool}")
+
+    def _respond(self, messages: List[BaseMessage], tools: Optional[List[Dict[str, Any]]]) -> AIMessage:
+        prompt = "\n".join(str(message.content) for message in messages)
+        if tools:
+            name = tools[0]["function"]["name"]
+            content = ""
+            tool_calls = [{"name": name, "args": self._arguments(name, prompt), "id": f"call_{next(self._counter)}"}]
+        else:
+            question = self._question(prompt)
+            options = "\n".join(f"{letter}) {option}" for letter, option in zip("ABCD", question["options"]))
+            content = f"{question['stem']}\n{options}\nANSWER: {question['answer_key']}"
+            tool_calls = []
+        output_tokens = len(content.split()) + sum(len(json.dumps(call["args"]).split()) for call in tool_calls)
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": len(prompt.split()),
+                "output_tokens": output_tokens,
+                "total_tokens": len(prompt.split()) + output_tokens,
+            },
+        )
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, kwargs.get("tools")))])
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, kwargs.get("tools")))])
+
+    def _stream(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        message = self._respond(messages, kwargs.get("tools"))
+        for word in re.findall(r"\S+\s*", message.content):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
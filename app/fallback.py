@@ -0,0 +1,55 @@
+# app/fallback.py
+import json
+import os
+import random
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from app.metrics import metrics
+from app.models import MCQItem
+from app.question_pool import PoolKey, pool_key
+
+ANY = "*"
+
+
+class FallbackQuestions:
+    """Curated MCQs served when live generation is too slow, read from a JSON file on first use.
+
+    The file holds a list of {"job_title", "experience", "stem", "options", "answer_key"} objects;
+    "*" as job title or experience matches any. A missing file means no curated questions.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._items: Optional[Dict[PoolKey, List[MCQItem]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[PoolKey, List[MCQItem]]:
+        with self._lock:
+            if self._items is None:
+                items: Dict[PoolKey, List[MCQItem]] = defaultdict(list)
+                if self.path and os.path.exists(self.path):
+                    with open(self.path, encoding="utf-8") as f:
+                        for entry in json.load(f):
+                            key = pool_key(entry.get("job_title", ANY), entry.get("experience", ANY))
+                            items[key].append(MCQItem.model_validate(entry))
+                self._items = dict(items)
+            return self._items
+
+    def sample(
+        self, job_title: str, experience: str, reject: Optional[Callable[[MCQItem], bool]] = None
+    ) -> Optional[MCQItem]:
+        """A random curated question for the key, preferring exact matches over wildcard entries."""
+        items = self._load()
+        job_key, experience_key = pool_key(job_title, experience)
+        for key in ((job_key, experience_key), (job_key, ANY), (ANY, experience_key), (ANY, ANY)):
+            candidates = [item for item in items.get(key, ()) if reject is None or not reject(item)]
+            if candidates:
+                metrics.increment("fallback_hits")
+                return random.choice(candidates)
+        metrics.increment("fallback_misses")
+        return None
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._load().values())
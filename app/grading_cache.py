@@ -0,0 +1,56 @@
+# app/grading_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, TypedDict
+
+from app.mcq import canonical_answer, normalize_text
+from app.metrics import metrics
+
+
+class CachedVerdict(TypedDict):
+    correct_answer: str
+    is_correct: bool
+    explanation: str
+
+
+def question_fingerprint(question: str) -> str:
+    return hashlib.sha256(normalize_text(question).encode("utf-8")).hexdigest()
+
+
+def grading_key(question: str, user_answer: str) -> Tuple[str, str]:
+    return question_fingerprint(question), canonical_answer(question, user_answer)
+
+
+class GradingCache:
+    """Process-wide LRU of verdicts keyed on (question fingerprint, normalized answer).
+
+    Shared by every session, so once one candidate's answer has been graded, any other candidate
+    giving the same answer to the same question is graded without an LLM call.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedVerdict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, question: str, user_answer: str) -> Optional[CachedVerdict]:
+        key = grading_key(question, user_answer)
+        with self._lock:
+            verdict = self._entries.get(key)
+            if verdict is not None:
+                self._entries.move_to_end(key)
+        metrics.increment("grading_cache_hits" if verdict is not None else "grading_cache_misses")
+        return verdict
+
+    def put(self, question: str, user_answer: str, verdict: CachedVerdict) -> None:
+        key = grading_key(question, user_answer)
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
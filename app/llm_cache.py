@@ -0,0 +1,191 @@
+# app/llm_cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from app.metrics import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_by_access ON llm_cache (accessed_at);
+"""
+
+
+def _dump_generations(return_val: RETURN_VAL_TYPE) -> str:
+    return json.dumps([
+        {"message": message_to_dict(generation.message)} if isinstance(generation, ChatGeneration)
+        else {"text": generation.text}
+        for generation in return_val
+    ])
+
+
+def _load_generations(value: str) -> RETURN_VAL_TYPE:
+    generations = []
+    for entry in json.loads(value):
+        if "message" in entry:
+            generations.append(ChatGeneration(message=messages_from_dict([entry["message"]])[0]))
+        else:
+            generations.append(Generation(text=entry["text"]))
+    return generations
+
+
+class TieredLLMCache(BaseCache):
+    """LLM response cache: a bounded in-memory LRU in front of an optional persistent SQLite tier.
+
+    Entries expire ttl_seconds after they were written, in both tiers. The memory tier keeps at
+    most max_entries responses; the SQLite tier is trimmed to max_disk_entries least recently used.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl_seconds: float = 24 * 3600,
+        sqlite_path: Optional[str] = None,
+        max_disk_entries: int = 200000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, RETURN_VAL_TYPE]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_trim = 0
+
+    @staticmethod
+    def _disk_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Caller holds self._disk_lock
+        if self._conn is None:
+            conn = sqlite3.connect(self.sqlite_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _memory_get(self, key: Tuple[str, str], now: float) -> Optional[RETURN_VAL_TYPE]:
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, return_val = entry
+            if now - created_at >= self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return return_val
+
+    def _memory_put(self, key: Tuple[str, str], created_at: float, return_val: RETURN_VAL_TYPE) -> None:
+        with self._memory_lock:
+            self._memory[key] = (created_at, return_val)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                metrics.increment("llm_cache_evictions")
+
+    def _disk_get(self, prompt: str, llm_string: str, now: float) -> Optional[Tuple[float, RETURN_VAL_TYPE]]:
+        if not self.sqlite_path:
+            return None
+        key = self._disk_key(prompt, llm_string)
+        with self._disk_lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[1], _load_generations(row[0])
+
+    def _disk_put(self, prompt: str, llm_string: str, created_at: float, return_val: RETURN_VAL_TYPE) -> None:
+        if not self.sqlite_path:
+            return
+        key = self._disk_key(prompt, llm_string)
+        value = _dump_generations(return_val)
+        with self._disk_lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, created_at, created_at),
+            )
+            self._writes_since_trim += 1
+            # Counting rows on every write would dominate the cost; trim periodically instead
+            if self._writes_since_trim >= 100:
+                self._writes_since_trim = 0
+                excess = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_disk_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                        (excess,),
+                    )
+                    metrics.increment("llm_cache_evictions", excess)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        now = time.time()
+        key = (prompt, llm_string)
+        return_val = self._memory_get(key, now)
+        if return_val is not None:
+            metrics.increment("llm_cache_memory_hits")
+            return return_val
+
+        entry = self._disk_get(prompt, llm_string, now)
+        if entry is not None:
+            created_at, return_val = entry
+            # Promote to the memory tier, keeping the original expiry
+            self._memory_put(key, created_at, return_val)
+            metrics.increment("llm_cache_disk_hits")
+            return return_val
+
+        metrics.increment("llm_cache_misses")
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        # A cached response costs no tokens when served again, so it should not report any
+        return_val = [
+            ChatGeneration(message=generation.message.model_copy(update={"usage_metadata": None}))
+            if isinstance(generation, ChatGeneration) else generation
+            for generation in return_val
+        ]
+        now = time.time()
+        self._memory_put((prompt, llm_string), now, return_val)
+        self._disk_put(prompt, llm_string, now, return_val)
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        # Memory hits are answered on the event loop; only the SQLite tier goes to a thread
+        return_val = self._memory_get((prompt, llm_string), time.time())
+        if return_val is not None:
+            metrics.increment("llm_cache_memory_hits")
+            return return_val
+        return await super().alookup(prompt, llm_string)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._memory_lock:
+            self._memory.clear()
+        if self.sqlite_path:
+            with self._disk_lock:
+                self._connection().execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,210 @@
+# app/llm_factory.py
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.config import (
+    FAKE_LLM_LATENCY_SECONDS,
+    GENERATION_MAX_OUTPUT_TOKENS,
+    GENERATION_MODEL,
+    GENERATION_STOP,
+    GENERATION_TEMPERATURE,
+    GRADING_MAX_OUTPUT_TOKENS,
+    GRADING_MODEL,
+    GRADING_STOP,
+    GRADING_TEMPERATURE,
+    LLM_BACKEND,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MAX_ROWS,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_RATE_LIMIT_BURST,
+    LLM_RATE_LIMIT_MAX_QUEUE,
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS,
+    LLM_REQUESTS_PER_SECOND,
+)
+
+GENERATION = "generation"
+GRADING = "grading"
+
+
+class TaskProfile(NamedTuple):
+    model: str
+    temperature: float
+    max_output_tokens: Optional[int]
+    stop: Optional[List[str]]
+    # Question generation must return fresh questions, so it opts out of the response cache
+    cache: Optional[bool]
+
+
+PROFILES: Dict[str, TaskProfile] = {
+    GENERATION: TaskProfile(
+        GENERATION_MODEL, GENERATION_TEMPERATURE, GENERATION_MAX_OUTPUT_TOKENS, GENERATION_STOP, False
+    ),
+    GRADING: TaskProfile(GRADING_MODEL, GRADING_TEMPERATURE, GRADING_MAX_OUTPUT_TOKENS, GRADING_STOP, None),
+}
+
+# name -> builder(task, profile, callbacks) returning a chat model
+Backend = Callable[[str, TaskProfile, List[Any]], Any]
+# name -> () -> the backend SDK's own exception types for transport and server failures
+Failures = Callable[[], Tuple[type, ...]]
+_backends: Dict[str, Backend] = {}
+_failures: Dict[str, Failures] = {}
+_models: Dict[str, Any] = {}
+_lock = threading.RLock()
+_shared: Dict[str, Any] = {}
+
+
+def register_backend(name: str, builder: Backend, failures: Optional[Failures] = None) -> None:
+    """Make a chat model backend selectable with LLM_BACKEND=<name>.
+
+    `failures` names SDK exceptions, beyond langchain's model errors, that mean the provider is
+    failing. It is only called once a call has failed, so it may import the SDK.
+    """
+    _backends[name] = builder
+    if failures is not None:
+        _failures[name] = failures
+
+
+def provider_failures() -> Tuple[type, ...]:
+    """Exceptions meaning the provider is failing: server, rate-limit, connection and timeout errors."""
+    failures = _shared.get("provider_failures")
+    if failures is None:
+        from langchain_core.exceptions import (
+            ModelAPIError,
+            ModelConnectionError,
+            ModelRateLimitError,
+            ModelTimeoutError,
+        )
+
+        failures = (
+            ModelAPIError, ModelConnectionError, ModelRateLimitError, ModelTimeoutError, ConnectionError, TimeoutError
+        )
+        if LLM_BACKEND in _failures:
+            failures += _failures[LLM_BACKEND]()
+        _shared["provider_failures"] = failures
+    return failures
+
+
+def rate_limiter():
+    """The outbound rate limiter shared by every model, or None when disabled."""
+    with _lock:
+        if "rate_limiter" not in _shared:
+            limiter = None
+            if LLM_REQUESTS_PER_SECOND > 0:
+                from app.rate_limit import QueuedRateLimiter
+
+                limiter = QueuedRateLimiter(
+                    requests_per_second=LLM_REQUESTS_PER_SECOND,
+                    max_bucket_size=max(1.0, LLM_RATE_LIMIT_BURST),
+                    max_wait_seconds=LLM_RATE_LIMIT_MAX_WAIT_SECONDS,
+                    max_queue=LLM_RATE_LIMIT_MAX_QUEUE,
+                )
+            _shared["rate_limiter"] = limiter
+        return _shared["rate_limiter"]
+
+
+def llm_cache():
+    """The tiered response cache, installed as langchain's global cache on first use; None when disabled."""
+    with _lock:
+        if "llm_cache" not in _shared:
+            cache = None
+            if LLM_CACHE_ENABLED:
+                from langchain_core.globals import set_llm_cache
+                from app.llm_cache import TieredLLMCache
+
+                cache = TieredLLMCache(
+                    max_entries=LLM_CACHE_MAX_ENTRIES,
+                    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                    sqlite_path=LLM_CACHE_PATH or None,
+                    max_disk_entries=LLM_CACHE_MAX_ROWS,
+                )
+                set_llm_cache(cache)
+            _shared["llm_cache"] = cache
+        return _shared["llm_cache"]
+
+
+def get_llm(task: str):
+    """The chat model for `task`, built by the configured backend the first time it is needed."""
+    model = _models.get(task)
+    if model is not None:
+        return model
+    with _lock:
+        if task not in _models:
+            builder = _backends.get(LLM_BACKEND)
+            if builder is None:
+                raise ValueError(f"Unknown LLM_BACKEND {LLM_BACKEND!r}; expected one of {sorted(_backends)}.")
+            from app.llm_metrics import TaskMetricsHandler
+
+            llm_cache()
+            _models[task] = builder(task, PROFILES[task], [TaskMetricsHandler(task)])
+        return _models[task]
+
+
+async def aget_llm(task: str):
+    """get_llm for the event loop: a model not built yet is built, or waited on, in a worker thread.
+
+    Building one imports the provider SDK under the factory lock, which a preload may be holding.
+    """
+    model = _models.get(task)
+    if model is not None:
+        return model
+    return await asyncio.to_thread(get_llm, task)
+
+
+def preload() -> None:
+    """Build every task's model now, e.g. from a worker thread at startup, so no request pays for it."""
+    for task in PROFILES:
+        get_llm(task)
+
+
+def close() -> None:
+    with _lock:
+        cache = _shared.pop("llm_cache", None)
+        if cache is not None:
+            cache.close()
+        _models.clear()
+
+
+def build_gemini(task: str, profile: TaskProfile, callbacks: List[Any]):
+    # Imported here: the Google SDK and grpc are slow to load and not needed by the fake backend
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from pydantic import SecretStr
+
+    api_key_str = os.getenv("GEMINI_API_KEY", "")
+    if not api_key_str:
+        raise ValueError("GEMINI_API_KEY not found. Please set it in your .env file or environment variables.")
+    return ChatGoogleGenerativeAI(
+        model=profile.model,
+        api_key=SecretStr(api_key_str),
+        temperature=profile.temperature,
+        max_output_tokens=profile.max_output_tokens,
+        stop=profile.stop,
+        rate_limiter=rate_limiter(),
+        max_retries=LLM_MAX_RETRIES,
+        callbacks=callbacks,
+        cache=profile.cache,
+    )
+
+
+def gemini_failures() -> Tuple[type, ...]:
+    # Errors the SDK and its HTTP client can raise without langchain classifying them
+    import httpx
+    from google.genai.errors import ServerError
+
+    return ServerError, httpx.TransportError
+
+
+def build_fake(task: str, profile: TaskProfile, callbacks: List[Any]):
+    from app.fake_llm import FakeChatModel
+
+    return FakeChatModel(
+        latency=FAKE_LLM_LATENCY_SECONDS, rate_limiter=rate_limiter(), callbacks=callbacks, cache=profile.cache
+    )
+
+
+register_backend("gemini", build_gemini, gemini_failures)
+register_backend("fake", build_fake)
@@ -0,0 +1,81 @@
+# app/llm_metrics.py
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+if TYPE_CHECKING:
+    from langchain_core.outputs import LLMResult
+
+from app.metrics import metrics
+from app.rate_limit import current_admission
+
+
+class TaskMetricsHandler(BaseCallbackHandler):
+    """Count calls, latency and token usage of one task's model under "<task>_..." metric names.
+
+    Responses without usage metadata (cache hits) are counted as <task>_llm_unmetered and
+    left out of the latency and token totals, so those reflect provider calls only. Latency is
+    timed from when the rate limiter let the call through; time spent queued before that is
+    reported separately as <task>_llm_queue_ms.
+    """
+
+    run_inline = True
+
+    def __init__(self, task: str):
+        self.task = task
+        self._started: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            self._started[run_id] = time.monotonic()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._started[run_id] = time.monotonic()
+
+    def on_llm_end(self, response: "LLMResult", *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        usage = None
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or usage
+        # Cache hits come back without token counts (langchain may still attach a zero cost)
+        if not usage or "input_tokens" not in usage:
+            metrics.increment(f"{self.task}_llm_unmetered")
+            return
+        metrics.increment(f"{self.task}_llm_calls")
+        if started is not None:
+            # The callback fires before the model waits on the rate limiter; an admission made
+            # after that belongs to this call (one from the context's previous call is older)
+            admission = current_admission()
+            if admission is not None and admission.admitted_at is not None and admission.admitted_at >= started:
+                metrics.increment(f"{self.task}_llm_queue_ms", int((admission.admitted_at - started) * 1000))
+                started = admission.admitted_at
+            metrics.increment(f"{self.task}_llm_latency_ms", int((time.monotonic() - started) * 1000))
+        metrics.increment(f"{self.task}_input_tokens", usage.get("input_tokens", 0))
+        metrics.increment(f"{self.task}_output_tokens", usage.get("output_tokens", 0))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._started.pop(run_id, None)
+        metrics.increment(f"{self.task}_llm_errors")
+
+
+def task_summary(counters: Dict[str, float], task: str) -> Dict[str, float]:
+    calls = counters.get(f"{task}_llm_calls", 0)
+    return {
+        "calls": calls,
+        "cached": counters.get(f"{task}_llm_unmetered", 0),
+        "errors": counters.get(f"{task}_llm_errors", 0),
+        "avg_latency_ms": counters.get(f"{task}_llm_latency_ms", 0) / calls if calls else 0.0,
+        "avg_queue_ms": counters.get(f"{task}_llm_queue_ms", 0) / calls if calls else 0.0,
+        "input_tokens": counters.get(f"{task}_input_tokens", 0),
+        "output_tokens": counters.get(f"{task}_output_tokens", 0),
+    }
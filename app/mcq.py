@@ -0,0 +1,140 @@
+# app/mcq.py
+import re
+from typing import List, Optional
+
+from app.models import OPTION_LETTERS, MCQItem
+
+# "b", "B)", "(b)", "b.", "option b", "answer: b"
+_LETTER_ONLY = re.compile(r"^(?:option|answer|choice)?\s*:?\s*\(?([a-d])\)?[.:]?$")
+# "b) some option text", "(b) some option text", "b. some option text"
+_LETTER_AND_TEXT = re.compile(r"^\(?([a-d])[).:]\s*(.+)$")
+
+
+def normalize_text(text: str) -> str:
+    """Fold case and whitespace only; punctuation is kept, so "C++" and "C#" stay distinct."""
+    return " ".join(text.lower().split())
+
+
+def match_option(item: MCQItem, user_answer: str) -> Optional[int]:
+    """Index of the option the answer picks, or None if it does not clearly pick exactly one."""
+    return match_option_text(item.options, user_answer)
+
+
+def match_option_text(options: List[str], user_answer: str) -> Optional[int]:
+    answer = user_answer.strip().lower()
+    if not answer or not options:
+        return None
+
+    letter_only = _LETTER_ONLY.match(answer)
+    if letter_only:
+        index = OPTION_LETTERS.lower().index(letter_only.group(1))
+        return index if index < len(options) else None
+
+    normalized_options = [normalize_text(option) for option in options]
+    letter_and_text = _LETTER_AND_TEXT.match(answer)
+    if letter_and_text:
+        index = OPTION_LETTERS.lower().index(letter_and_text.group(1))
+        # Only trust the letter when the text agrees with it
+        if index < len(options) and normalize_text(letter_and_text.group(2)) == normalized_options[index]:
+            return index
+        return None
+
+    normalized = normalize_text(answer)
+    matches = [index for index, option in enumerate(normalized_options) if option and option == normalized]
+    return matches[0] if len(matches) == 1 else None
+
+
+def grade_locally(item: MCQItem, user_answer: str) -> Optional[bool]:
+    """Grade against the stored answer key; None means the answer is ambiguous and needs the LLM."""
+    index = match_option(item, user_answer)
+    if index is None:
+        return None
+    return index == item.answer_index
+
+
+def describe_answer(item: MCQItem) -> str:
+    return f"{item.answer_key}) {item.options[item.answer_index]}"
+
+
+_OPTION_LINE = re.compile(r"^\s*\(?([A-Da-d])[).:]\s*(.+?)\s*$")
+# "ANSWER: B", "Answer - b", "answer : (B)"; the parser and AnswerWithholder share this prefix
+_ANSWER_START = re.compile(r"\s*answer\s*[:\-]", re.IGNORECASE)
+_ANSWER_LINE = re.compile(_ANSWER_START.pattern + r"\s*\(?([A-Da-d])\b", re.IGNORECASE)
+# A partial line that may still turn into an answer line: "", "  An", "ANSWER ", ...
+_ANSWER_START_PREFIX = re.compile(r"\s*(?:a(?:n(?:s(?:w(?:e(?:r\s*)?)?)?)?)?)?", re.IGNORECASE)
+
+
+def parse_mcq_text(text: str) -> Optional[MCQItem]:
+    """Parse a question written as stem, "A) ..." to "D) ..." option lines and an "ANSWER: X" line."""
+    stem_lines, options, answer_key = [], [], None
+    for line in text.strip().splitlines():
+        answer = _ANSWER_LINE.match(line)
+        if answer:
+            answer_key = answer.group(1)
+            break
+        option = _OPTION_LINE.match(line)
+        if option and option.group(1).upper() == OPTION_LETTERS[len(options):len(options) + 1]:
+            options.append(option.group(2))
+        elif not options and line.strip():
+            stem_lines.append(line.strip())
+
+    if not stem_lines or len(options) != len(OPTION_LETTERS) or answer_key is None:
+        return None
+    return MCQItem(stem=" ".join(stem_lines), options=options, answer_key=answer_key)
+
+
+def parse_options(text: str) -> List[str]:
+    """Option texts from the "A) ..." to "D) ..." lines of a rendered question, or [] if incomplete."""
+    options = []
+    for line in text.splitlines():
+        option = _OPTION_LINE.match(line)
+        if option and option.group(1).upper() == OPTION_LETTERS[len(options):len(options) + 1]:
+            options.append(option.group(2))
+    return options if len(options) == len(OPTION_LETTERS) else []
+
+
+def canonical_answer(question: str, user_answer: str) -> str:
+    """Normalize an answer so that "b", "B)" and the text of option B all compare equal."""
+    index = match_option_text(parse_options(question), user_answer)
+    if index is not None:
+        return f"option:{OPTION_LETTERS[index]}"
+    return f"text:{normalize_text(user_answer)}"
+
+
+class AnswerWithholder:
+    """Passes streamed text through until the answer line starts, so the key never reaches the client.
+
+    Each line is held back while it could still become an answer line as parse_mcq_text reads
+    them, and released as soon as it is ruled out.
+    """
+
+    def __init__(self):
+        self._line = ""  # Held text of the current line
+        self._line_released = False  # The current line was ruled out and is passed straight through
+        self._stopped = False
+
+    def feed(self, chunk: str) -> str:
+        visible = []
+        for piece in chunk.splitlines(keepends=True):
+            if self._stopped:
+                break
+            if self._line_released:
+                visible.append(piece)
+            else:
+                self._line += piece
+                if _ANSWER_START.match(self._line):
+                    self._stopped = True
+                    self._line = ""
+                    break
+                if not _ANSWER_START_PREFIX.fullmatch(self._line):
+                    visible.append(self._line)
+                    self._line, self._line_released = "", True
+            if piece.splitlines()[0] != piece:
+                # The line ended without becoming an answer line
+                visible.append(self._line)
+                self._line, self._line_released = "", False
+        return "".join(visible)
+
+    def flush(self) -> str:
+        visible, self._line = ("" if self._stopped else self._line), ""
+        return visible
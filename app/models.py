@@ -1,5 +1,10 @@
-from pydantic import BaseModel
-from typing import Optional
+import re
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+
+OPTION_LETTERS = "ABCD"
+# "B", "(b)", "B.", "Answer: B", "option b": one option letter, optionally labelled
+_ANSWER_KEY = re.compile(r"(?:(?:answer|option|choice)\s*[:\-]?\s*)?\(?([A-D])\)?[.:]?", re.IGNORECASE)
 
 
 class UserInput(BaseModel):
@@ -9,7 +14,75 @@ class UserInput(BaseModel):
     job_title: str
     experience: str
     years_of_experience: Optional[str] = None  # Optional field for more granular experience tracking
+    prefetch: Optional[bool] = None  # Prefetch each next question in the background; defaults to PREFETCH_QUESTIONS
 
 
 class UserResponse(BaseModel):
+    candidate_id: str  # Identifies which interview session the answer belongs to
     user_response: str
+
+
+class FeedbackRequest(BaseModel):
+    candidate_id: str
+
+
+class AnswerVerdict(BaseModel):
+    """Structured grading verdict for one question/answer pair."""
+
+    index: int = Field(default=0, description="Zero-based index of the graded item")
+    is_correct: bool = Field(description="Whether the user's answer is correct")
+    correct_answer: str = Field(description="The correct answer to the question")
+    explanation: str = Field(description="A brief explanation of the verdict")
+
+
+class GradingReport(BaseModel):
+    """Verdicts for every item of a batched grading request."""
+
+    verdicts: List[AnswerVerdict]
+
+
+class MCQItem(BaseModel):
+    """A multiple-choice question with its answer key; the key is never sent to the candidate."""
+
+    stem: str = Field(description="The question itself, without the answer options")
+    options: List[str] = Field(
+        min_length=4, max_length=4, description="Exactly four answer options, without letter labels"
+    )
+    answer_key: str = Field(description="Letter of the correct option: A, B, C or D")
+
+    @field_validator("stem")
+    @classmethod
+    def strip_stem(cls, value: str) -> str:
+        if not value.strip():
+            raise ValueError("Question stem is empty.")
+        return value.strip()
+
+    @field_validator("options")
+    @classmethod
+    def strip_option_labels(cls, value: List[str]) -> List[str]:
+        # Models often prefix options with "A)" or "(b)" despite being asked not to
+        return [re.sub(r"^\(?[A-Da-d][).:]\s+", "", option.strip()) for option in value]
+
+    @field_validator("answer_key")
+    @classmethod
+    def normalize_answer_key(cls, value: str) -> str:
+        key = _ANSWER_KEY.fullmatch(value.strip())
+        if key is None:
+            raise ValueError(f"Answer key must be exactly one of {', '.join(OPTION_LETTERS)}.")
+        return key.group(1).upper()
+
+    @property
+    def answer_index(self) -> int:
+        return OPTION_LETTERS.index(self.answer_key)
+
+    def render(self) -> str:
+        """The question as shown to the candidate."""
+        return "\n".join(
+            [self.stem] + [f"{letter}) {option}" for letter, option in zip(OPTION_LETTERS, self.options)]
+        )
+
+
+class GeneratedQuestions(BaseModel):
+    """Several interview questions produced by one generation call."""
+
+    questions: List[MCQItem]
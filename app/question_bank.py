@@ -0,0 +1,147 @@
+# app/question_bank.py
+import asyncio
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.metrics import metrics
+from app.models import MCQItem
+from app.question_pool import PoolKey, pool_key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    job_key TEXT NOT NULL,
+    experience_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    question_hash TEXT NOT NULL,
+    question TEXT NOT NULL,
+    item TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_key, experience_key, seq)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS questions_by_hash ON questions (job_key, experience_key, question_hash);
+CREATE TABLE IF NOT EXISTS bank_keys (
+    job_key TEXT NOT NULL,
+    experience_key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (job_key, experience_key)
+) WITHOUT ROWID;
+"""
+
+
+class QuestionBank:
+    """Durable store of generated MCQs and their answer keys, keyed by normalized job title and experience.
+
+    Each key's questions are numbered 0..count-1, so a random pick is a single primary-key
+    lookup regardless of how many items are stored. The database is opened on first use
+    and read through SQLite's memory-mapped I/O.
+    """
+
+    def __init__(self, path: str, mmap_size: int = 256 * 1024 * 1024):
+        self.path = path
+        self.mmap_size = mmap_size
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._counts: Dict[PoolKey, int] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        # Caller holds self._lock
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _count(self, conn: sqlite3.Connection, key: PoolKey) -> int:
+        # Caller holds self._lock
+        count = self._counts.get(key)
+        if count is None:
+            row = conn.execute(
+                "SELECT count FROM bank_keys WHERE job_key = ? AND experience_key = ?", key
+            ).fetchone()
+            count = self._counts[key] = row[0] if row else 0
+        return count
+
+    def add(self, job_title: str, experience: str, item: MCQItem) -> bool:
+        """Store a question; returns False if the key already holds the same text."""
+        key = pool_key(job_title, experience)
+        question = item.render()
+        question_hash = hashlib.sha1(question.encode("utf-8")).hexdigest()
+        with self._lock:
+            conn = self._connection()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                # Re-read under the write lock; other worker processes may share the file
+                self._counts.pop(key, None)
+                seq = self._count(conn, key)
+                conn.execute(
+                    "INSERT INTO questions (job_key, experience_key, seq, question_hash, question, item, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, seq, question_hash, question, item.model_dump_json(), time.time()),
+                )
+                conn.execute(
+                    "INSERT INTO bank_keys (job_key, experience_key, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT (job_key, experience_key) DO UPDATE SET count = count + 1",
+                    key,
+                )
+                conn.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                conn.execute("ROLLBACK")
+                self._counts.pop(key, None)
+                return False
+            except BaseException:
+                # Never leave the shared connection inside a transaction: every later add would
+                # fail to BEGIN, and the write lock would stay held against other workers
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                self._counts.pop(key, None)
+                raise
+            self._counts[key] = seq + 1
+        metrics.increment("bank_stored")
+        return True
+
+    def _draw(self, key: PoolKey, attempts: int) -> List[MCQItem]:
+        """Up to `attempts` randomly chosen stored questions for the key; may repeat."""
+        items = []
+        with self._lock:
+            conn = self._connection()
+            count = self._count(conn, key)
+            for _ in range(min(attempts, count)):
+                row = conn.execute(
+                    "SELECT item FROM questions WHERE job_key = ? AND experience_key = ? AND seq = ?",
+                    (*key, random.randrange(count)),
+                ).fetchone()
+                if row:
+                    items.append(MCQItem.model_validate_json(row[0]))
+        return items
+
+    async def sample(
+        self,
+        job_title: str,
+        experience: str,
+        reject: Optional[Callable[[MCQItem], bool]] = None,
+        attempts: int = 5,
+    ) -> Optional[MCQItem]:
+        """Return a random stored question for the key that `reject` accepts.
+
+        SQLite is read in a worker thread, where opening the database or waiting for a writer
+        cannot stall the event loop; `reject` runs on the caller's loop.
+        """
+        for item in await asyncio.to_thread(self._draw, pool_key(job_title, experience), attempts):
+            if reject is None or not reject(item):
+                metrics.increment("bank_hits")
+                return item
+        metrics.increment("bank_misses")
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
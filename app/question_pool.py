@@ -0,0 +1,140 @@
+# app/question_pool.py
+import asyncio
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from app.dedup import NearDuplicateIndex
+from app.metrics import metrics
+from app.models import MCQItem
+
+PoolKey = Tuple[str, str]
+
+
+def pool_key(job_title: str, experience: str) -> PoolKey:
+    """Normalize (job_title, experience) so trivially different spellings share a pool."""
+    return " ".join(job_title.lower().split()), " ".join(experience.lower().split())
+
+
+class QuestionPool:
+    """Pre-generated MCQs per (job_title, experience), refilled in the background.
+
+    A refill starts when a key drops below low_watermark and tops it up to high_watermark.
+    Only the max_keys most recently used keys are kept. With a near_duplicate_threshold,
+    refills drop questions that closely reword one already generated for the key.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str, str], Awaitable[Optional[MCQItem]]],
+        low_watermark: int = 2,
+        high_watermark: int = 8,
+        max_keys: int = 256,
+        refill_concurrency: int = 4,
+        near_duplicate_threshold: Optional[float] = None,
+    ):
+        if high_watermark < low_watermark:
+            raise ValueError("Question pool high watermark must not be below the low watermark.")
+        self._generate = generate
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.max_keys = max_keys
+        self._queues: "OrderedDict[PoolKey, Deque[MCQItem]]" = OrderedDict()
+        self._refills: Dict[PoolKey, asyncio.Task] = {}
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._indexes: Dict[PoolKey, NearDuplicateIndex] = {}
+        self._refill_slots = asyncio.Semaphore(max(1, refill_concurrency))
+
+    def _queue(self, key: PoolKey) -> Deque[MCQItem]:
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            while len(self._queues) > self.max_keys:
+                evicted, _ = self._queues.popitem(last=False)
+                self._indexes.pop(evicted, None)
+                refill = self._refills.pop(evicted, None)
+                if refill is not None:
+                    refill.cancel()
+        else:
+            self._queues.move_to_end(key)
+        return queue
+
+    def take(
+        self, job_title: str, experience: str, reject: Optional[Callable[[MCQItem], bool]] = None
+    ) -> Optional[MCQItem]:
+        """Pop a pooled question `reject` accepts, scheduling a refill when the pool runs low."""
+        key = pool_key(job_title, experience)
+        queue = self._queue(key)
+        question = None
+        # Questions this session has already seen stay pooled for other candidates
+        for _ in range(len(queue)):
+            candidate = queue.popleft()
+            if reject is None or not reject(candidate):
+                question = candidate
+                break
+            queue.append(candidate)
+
+        metrics.increment("pool_hits" if question is not None else "pool_misses")
+        self.ensure_refill(job_title, experience)
+        return question
+
+    def ensure_refill(self, job_title: str, experience: str) -> None:
+        key = pool_key(job_title, experience)
+        queue = self._queue(key)
+        if len(queue) >= self.low_watermark or key in self._refills:
+            return
+        task = asyncio.create_task(self._refill(key, queue, job_title, experience))
+        self._refills[key] = task
+
+        def forget(done: asyncio.Task) -> None:
+            if self._refills.get(key) is done:
+                del self._refills[key]
+
+        task.add_done_callback(forget)
+
+    async def _refill(self, key: PoolKey, queue: Deque[MCQItem], job_title: str, experience: str) -> None:
+        failures = 0
+        while len(queue) < self.high_watermark and failures < 3:
+            async with self._refill_slots:
+                try:
+                    question = await self._generate(job_title, experience)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    failures += 1
+                    metrics.increment("pool_refill_errors")
+                    continue
+            if question is not None and question not in queue and self._is_new(key, question):
+                queue.append(question)
+                metrics.increment("pool_generated")
+            else:
+                failures += 1
+                metrics.increment("pool_duplicates_dropped")
+
+    def _is_new(self, key: PoolKey, question: MCQItem) -> bool:
+        if self.near_duplicate_threshold is None:
+            return True
+        index = self._indexes.get(key)
+        # Start over once a key has seen many questions, so a long-lived pool cannot exhaust its topic
+        if index is None or len(index) >= self.high_watermark * 50:
+            index = self._indexes[key] = NearDuplicateIndex(self.near_duplicate_threshold)
+        return index.add(question.render())
+
+    def warm(self, keys: Iterable[Tuple[str, str]]) -> None:
+        """Start filling the pools for the given (job_title, experience) pairs."""
+        for job_title, experience in keys:
+            self.ensure_refill(job_title, experience)
+
+    def close(self) -> None:
+        for task in list(self._refills.values()):
+            task.cancel()
+        self._refills.clear()
+
+
+def parse_prewarm_keys(value: str) -> List[PoolKey]:
+    """Parse "Job Title:experience;Other Title:experience" into (job_title, experience) pairs."""
+    keys: List[PoolKey] = []
+    for entry in value.split(";"):
+        job_title, _, experience = entry.partition(":")
+        if job_title.strip() and experience.strip():
+            keys.append((job_title.strip(), experience.strip()))
+    return keys
@@ -0,0 +1,171 @@
+# app/rate_limit.py
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Optional
+
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from app.metrics import metrics
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of waiting when an LLM call would have to queue longer than allowed."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM rate limit reached; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class Admission:
+    """When one LLM call started, and when the rate limiter queued it and let it through.
+
+    Tracked for the current context with track_admission(). The limiter fills it in, including
+    from tasks the model spawns for the call, since those copy the context.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.queued_at: Optional[float] = None
+        self.admitted_at: Optional[float] = None
+
+    @property
+    def queued(self) -> bool:
+        """Waiting in the limiter's queue right now."""
+        return self.queued_at is not None and self.admitted_at is None
+
+    @property
+    def running_since(self) -> float:
+        """When the call was let through to the provider; its start if no limiter was involved."""
+        return self.started if self.admitted_at is None else self.admitted_at
+
+
+_admission: ContextVar[Optional[Admission]] = ContextVar("llm_admission", default=None)
+
+
+def track_admission(admission: Optional[Admission] = None) -> Admission:
+    """Track the admission of the LLM call about to be made from the current context."""
+    admission = admission or Admission()
+    _admission.set(admission)
+    return admission
+
+
+def current_admission() -> Optional[Admission]:
+    return _admission.get()
+
+
+def _mark(field: str) -> None:
+    admission = _admission.get()
+    if admission is not None:
+        setattr(admission, field, time.monotonic())
+
+
+class QueuedRateLimiter(InMemoryRateLimiter):
+    """Token bucket shared by every outbound LLM call, with a FIFO queue and a bounded wait.
+
+    Callers are served in arrival order. A caller that would wait longer than max_wait_seconds,
+    or finds max_queue callers already waiting, gets RateLimitExceeded right away instead.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        max_bucket_size: float = 1,
+        max_wait_seconds: float = 10.0,
+        max_queue: int = 100,
+        check_every_n_seconds: float = 0.05,
+    ):
+        super().__init__(
+            requests_per_second=requests_per_second,
+            check_every_n_seconds=check_every_n_seconds,
+            max_bucket_size=max_bucket_size,
+        )
+        # Start refilling now: a bucket that only starts on the first token taken would never
+        # start when every caller is rejected up front for a quota below 1 / max_wait_seconds
+        self.last = time.monotonic()
+        self.max_wait_seconds = max_wait_seconds
+        self.max_queue = max_queue
+        self._queue: Deque[int] = deque()
+        self._queue_lock = threading.Lock()
+        self._tickets = itertools.count()
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds until the caller at `position` in the queue (0 = head) can expect a token."""
+        # Count the refill since the bucket was last touched
+        refill = (time.monotonic() - self.last) * self.requests_per_second
+        tokens = min(self.max_bucket_size, self.available_tokens + refill)
+        return max(0.0, position + 1 - tokens) / self.requests_per_second
+
+    def _enqueue(self) -> int:
+        with self._queue_lock:
+            wait = self.estimated_wait(len(self._queue))
+            if len(self._queue) >= self.max_queue or wait > self.max_wait_seconds:
+                metrics.increment("rate_limit_rejected")
+                raise RateLimitExceeded(wait)
+            ticket = next(self._tickets)
+            self._queue.append(ticket)
+        _mark("queued_at")
+        return ticket
+
+    def _try_now(self) -> bool:
+        # A non-blocking caller must not jump ahead of queued ones
+        with self._queue_lock:
+            admitted = not self._queue and self._consume()
+        if admitted:
+            _mark("admitted_at")
+        return admitted
+
+    def _try_take(self, ticket: int) -> bool:
+        # Only the head of the queue may take a token, which keeps the order fair
+        with self._queue_lock:
+            if self._queue[0] != ticket or not self._consume():
+                return False
+            self._queue.popleft()
+            return True
+
+    def _leave(self, ticket: int) -> None:
+        with self._queue_lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+
+    def _timed_out(self, ticket: int) -> None:
+        with self._queue_lock:
+            position = self._queue.index(ticket) if ticket in self._queue else 0
+        metrics.increment("rate_limit_timeouts")
+        raise RateLimitExceeded(self.estimated_wait(position))
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self._try_now()
+        ticket = self._enqueue()
+        started, deadline = time.monotonic(), time.monotonic() + self.max_wait_seconds
+        try:
+            while not self._try_take(ticket):
+                if time.monotonic() >= deadline:
+                    self._timed_out(ticket)
+                time.sleep(self.check_every_n_seconds)
+        finally:
+            self._leave(ticket)
+        _mark("admitted_at")
+        metrics.increment("rate_limit_wait_ms", int((time.monotonic() - started) * 1000))
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self._try_now()
+        ticket = self._enqueue()
+        started, deadline = time.monotonic(), time.monotonic() + self.max_wait_seconds
+        try:
+            while not self._try_take(ticket):
+                if time.monotonic() >= deadline:
+                    self._timed_out(ticket)
+                await asyncio.sleep(self.check_every_n_seconds)
+        finally:
+            # Also covers cancellation, so an abandoned caller never blocks the queue
+            self._leave(ticket)
+        _mark("admitted_at")
+        metrics.increment("rate_limit_wait_ms", int((time.monotonic() - started) * 1000))
+        return True
@@ -0,0 +1,150 @@
+# app/resilience.py
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional
+
+from app.metrics import metrics
+from app.rate_limit import Admission, track_admission
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM provider unavailable; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fail fast after repeated provider errors.
+
+    After failure_threshold consecutive failures the circuit opens and calls are refused for
+    reset_timeout seconds. Then a single trial call is let through: success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0 or self._trial_running:
+                metrics.increment("circuit_rejected")
+                raise CircuitOpenError(max(remaining, 1.0))
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_running:
+                    metrics.increment("circuit_opened")
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+    def record_cancelled(self) -> None:
+        # A cancelled trial call tells us nothing; let the next caller try
+        with self._lock:
+            self._trial_running = False
+
+
+class LatencyTracker:
+    """Recent call latencies, for picking the point at which to hedge."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th percentile (0-100) of recent latencies, or None until there are enough samples."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+async def hedged(
+    call: Callable[[], Awaitable[Any]],
+    latencies: LatencyTracker,
+    percentile: float = 95.0,
+    min_delay: float = 0.05,
+    max_hedges: int = 1,
+) -> Any:
+    """Run `call`; each time the attempts in flight outlast the latency percentile, start another.
+
+    The first attempt to succeed wins and the rest are cancelled. Until enough latencies have been
+    seen to estimate the percentile, no hedges are sent. Latency is counted from when the rate
+    limiter lets an attempt through, and no hedge is sent while the newest attempt is still queued:
+    it would only join the same queue.
+    """
+    delay = latencies.percentile(percentile)
+    admissions: List[Admission] = []
+
+    async def timed(admission: Admission) -> Any:
+        track_admission(admission)
+        result = await call()
+        latencies.record(time.monotonic() - admission.running_since)
+        return result
+
+    def attempt() -> asyncio.Task:
+        admissions.append(Admission())
+        return asyncio.create_task(timed(admissions[-1]))
+
+    primary = attempt()
+    attempts = {primary}
+    hedges = 0
+    error: Optional[BaseException] = None
+    try:
+        while attempts:
+            timeout = None
+            if delay is not None and hedges < max_hedges:
+                timeout = max(min_delay, delay - (time.monotonic() - admissions[-1].running_since))
+            done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                newest = admissions[-1]
+                if newest.queued or time.monotonic() - newest.running_since < delay:
+                    continue
+                hedges += 1
+                metrics.increment("hedges_sent")
+                attempts.add(attempt())
+                continue
+            for task in done:
+                attempts.discard(task)
+                if task.exception() is None:
+                    if task is not primary:
+                        metrics.increment("hedge_wins")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in attempts:
+            task.cancel()
@@ -1,83 +1,429 @@
-from langchain_core.messages import HumanMessage, AIMessage
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import math
+from functools import partial
+from typing import AsyncIterator, Optional, Set, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from langchain_core.exceptions import ModelRateLimitError
 from app.services import (
     MessagesState,
-    generate_question_with_llm,
-    score_and_provide_feedback,
+    afill_question_buffer,
+    afind_unique_question,
+    aget_feedback_summary,
+    astream_feedback,
+    astream_question,
+    circuit_breakers,
+    agenerate_mcq,
+    atake_prefetched_question,
+    is_repeat,
+    prefetch_pending,
+    record_question,
+    schedule_background_grading,
+    start_prefetch,
+    take_buffered_question,
 )
-from app.config import llm
-from app.models import UserInput, UserResponse
+from app.config import (
+    BACKGROUND_GRADING,
+    CIRCUIT_RESET_SECONDS,
+    FALLBACK_QUESTIONS_PATH,
+    FEEDBACK_DEADLINE_SECONDS,
+    GENERATION_LATENCY_BUDGET_SECONDS,
+    NEAR_DUPLICATE_THRESHOLD,
+    PREFETCH_QUESTIONS,
+    QUESTION_BANK_MMAP_SIZE,
+    QUESTION_DEADLINE_SECONDS,
+    QUESTION_BANK_PATH,
+    QUESTION_POOL_DEDUP,
+    QUESTION_POOL_ENABLED,
+    QUESTION_POOL_HIGH_WATERMARK,
+    QUESTION_POOL_LOW_WATERMARK,
+    QUESTION_POOL_MAX_KEYS,
+    QUESTION_POOL_REFILL_CONCURRENCY,
+    QUESTIONS_PER_CALL,
+    REQUEST_DEADLINE_MAX_SECONDS,
+    SESSION_MAX_SESSIONS,
+    SESSION_SHARDS,
+    SESSION_TTL_SECONDS,
+)
+from app.deadlines import Deadline, DeadlineExceeded, parse_timeout, within
+from app.fallback import FallbackQuestions
+from app.llm_factory import GENERATION, GRADING, aget_llm
+from app.llm_metrics import task_summary
+from app.metrics import metrics, ratio
+from app.models import FeedbackRequest, MCQItem, UserInput, UserResponse
+from pydantic import ValidationError
+from app.question_bank import QuestionBank
+from app.question_pool import QuestionPool
+from app.rate_limit import RateLimitExceeded
+from app.resilience import CircuitOpenError
+from app.sessions import SessionStore
 
 router = APIRouter()
-conversation_state = MessagesState()
+sessions = SessionStore(
+    shards=SESSION_SHARDS,
+    ttl_seconds=SESSION_TTL_SECONDS,
+    max_sessions=SESSION_MAX_SESSIONS,
+)
+question_bank = QuestionBank(QUESTION_BANK_PATH, mmap_size=QUESTION_BANK_MMAP_SIZE) if QUESTION_BANK_PATH else None
+fallback_questions = FallbackQuestions(FALLBACK_QUESTIONS_PATH)
+# Fire-and-forget tasks, referenced here so they are not garbage collected mid-flight
+background_tasks: Set[asyncio.Task] = set()
+
+
+async def store_in_bank(job_title: str, experience: str, question: MCQItem) -> None:
+    """Persist a freshly generated question so it survives restarts."""
+    if question_bank is None:
+        return
+    try:
+        await asyncio.to_thread(question_bank.add, job_title, experience, question)
+    except Exception:
+        metrics.increment("bank_errors")
+
+
+async def generate_pooled_question(job_title: str, experience: str) -> Optional[MCQItem]:
+    question = await agenerate_mcq(await aget_llm(GENERATION), job_title, experience)
+    if question is not None:
+        await store_in_bank(job_title, experience, question)
+    return question
+
+
+question_pool = QuestionPool(
+    generate_pooled_question,
+    low_watermark=QUESTION_POOL_LOW_WATERMARK,
+    high_watermark=QUESTION_POOL_HIGH_WATERMARK,
+    max_keys=QUESTION_POOL_MAX_KEYS,
+    refill_concurrency=QUESTION_POOL_REFILL_CONCURRENCY,
+    near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD if QUESTION_POOL_DEDUP else None,
+)
+
+
+# Errors that mean "try again later" rather than a failed request; ModelRateLimitError is the
+# provider's own 429 (e.g. exhausted Gemini quota)
+RETRY_LATER = (RateLimitExceeded, CircuitOpenError, ModelRateLimitError)
+
+
+def retry_later_status(e: Exception) -> int:
+    return 429 if isinstance(e, (RateLimitExceeded, ModelRateLimitError)) else 503
+
+
+def retry_after_seconds(e: Exception) -> int:
+    # The provider does not say when its quota refills; suggest the circuit breaker's cool-down
+    return max(1, math.ceil(getattr(e, "retry_after", CIRCUIT_RESET_SECONDS)))
+
+
+def retry_later(e: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=retry_later_status(e), detail=str(e), headers={"Retry-After": str(retry_after_seconds(e))}
+    )
+
+
+def retry_later_event(e: Exception) -> dict:
+    return {"status": retry_later_status(e), "detail": str(e), "retry_after": retry_after_seconds(e)}
+
+
+def request_deadline(default_seconds: float):
+    """Dependency giving each request a deadline from its X-Request-Timeout header or the route default."""
+    def dependency(x_request_timeout: Optional[str] = Header(None)) -> Deadline:
+        return Deadline(parse_timeout(x_request_timeout, default_seconds, REQUEST_DEADLINE_MAX_SECONDS))
+    return dependency
+
+
+def get_session(candidate_id: str) -> MessagesState:
+    state = sessions.get(candidate_id.strip())
+    if state is None:
+        raise HTTPException(status_code=404, detail="No active interview for this candidate.")
+    return state
+
+
+def open_session(user_input: UserInput) -> MessagesState:
+    candidate_id = user_input.candidate_id.strip()
+
+    # Validate candidateId and job title
+    if not candidate_id:
+        raise HTTPException(status_code=400, detail="Candidate ID is missing.")
+    if not user_input.job_title.strip():
+        raise HTTPException(status_code=400, detail="Job title is missing in user input.")
+
+    # Start a fresh conversation state, replacing any earlier interview for this candidate
+    conversation_state = sessions.create(candidate_id)
+    conversation_state.user_info = {
+        "candidate_id": candidate_id,  # Store candidateId
+        "candidate_name": user_input.candidate_name.strip(),
+        "email": user_input.email.strip(),
+        "job_title": user_input.job_title.strip(),
+        "experience": user_input.experience.strip(),
+    }
+    conversation_state.prefetch_enabled = (
+        PREFETCH_QUESTIONS if user_input.prefetch is None else user_input.prefetch
+    )
+    return conversation_state
+
+
+def accept_answer(user_response: UserResponse) -> MessagesState:
+    conversation_state = get_session(user_response.candidate_id)
+
+    # Store the user's response
+    conversation_state.add_message(user_response.user_response.strip().lower(), from_candidate=True)
+    conversation_state.user_answers.append(user_response.user_response.strip().lower())
+
+    # Validate candidateId and job title
+    if not conversation_state.user_info.get("candidate_id"):
+        raise HTTPException(status_code=400, detail="Candidate ID is missing.")
+    if not conversation_state.user_info.get("job_title", "").strip():
+        raise HTTPException(status_code=400, detail="Job title is missing.")
+
+    # Start grading this answer while the candidate reads the next question
+    if BACKGROUND_GRADING:
+        schedule_background_grading(conversation_state, len(conversation_state.user_answers) - 1)
+    return conversation_state
+
+
+def interview_complete(state: MessagesState) -> bool:
+    return len(state.user_answers) >= state.total_questions
 
 
 @router.post("/start")
-async def start_interview(user_input: UserInput):
+async def start_interview(
+    user_input: UserInput, deadline: Deadline = Depends(request_deadline(QUESTION_DEADLINE_SECONDS))
+):
     try:
-        # Reset conversation state for a new interview
-        conversation_state.messages.clear()
-        conversation_state.user_info = {
-            "candidate_id": user_input.candidate_id,  # Store candidateId
-            "candidate_name": user_input.candidate_name.strip(),
-            "email": user_input.email.strip(),
-            "job_title": user_input.job_title.strip(),
-            "experience": user_input.experience.strip(),
-        }
-        conversation_state.user_answers.clear()
-        conversation_state.correct_answers.clear()
-        conversation_state.asked_questions.clear()
-
-        # Validate candidateId and job title
-        if not conversation_state.user_info.get("candidate_id"):
-            raise HTTPException(status_code=400, detail="Candidate ID is missing.")
-        if not conversation_state.user_info.get("job_title"):
-            raise HTTPException(status_code=400, detail="Job title is missing in user input.")
+        conversation_state = open_session(user_input)
 
         # Generate the first question
-        question = generate_next_question(
-            llm, conversation_state, user_input.job_title, user_input.experience
+        question, degraded = await generate_next_question(
+            await aget_llm(GENERATION), conversation_state, user_input.job_title, user_input.experience, deadline
         )
-        conversation_state.messages.append(AIMessage(content=question))
+        conversation_state.add_message(question)
 
-        return {"message": "Interview started", "question": question}
+        return {"message": "Interview started", "question": question, "degraded": degraded}
+    except HTTPException:
+        raise
+    except RETRY_LATER as e:
+        raise retry_later(e)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting interview: {str(e)}")
 
 
 @router.post("/next_question")
-async def next_question(user_response: UserResponse):
+async def next_question(
+    user_response: UserResponse, deadline: Deadline = Depends(request_deadline(QUESTION_DEADLINE_SECONDS))
+):
     try:
-        # Store the user's response
-        conversation_state.messages.append(HumanMessage(content=user_response.user_response.strip().lower()))
-        conversation_state.user_answers.append(user_response.user_response.strip().lower())
+        conversation_state = accept_answer(user_response)
 
         # Retrieve user information
         job_title = conversation_state.user_info.get("job_title", "").strip()
         experience = conversation_state.user_info.get("experience", "").strip()
 
-        # Validate candidateId and job title
-        if not conversation_state.user_info.get("candidate_id"):
-            raise HTTPException(status_code=400, detail="Candidate ID is missing.")
-        if not job_title:
-            raise HTTPException(status_code=400, detail="Job title is missing.")
-
         # Check if the interview is complete
-        if len(conversation_state.user_answers) >= conversation_state.total_questions:
-            feedback_details = score_and_provide_feedback(conversation_state)
+        if interview_complete(conversation_state):
+            feedback_details = await aget_feedback_summary(conversation_state, deadline)
             return {"complete": True, "feedback": feedback_details}
 
         # Generate the next question
-        question = generate_next_question(llm, conversation_state, job_title, experience)
-        conversation_state.messages.append(AIMessage(content=question))
-        return {"message": "Next question generated", "question": question}
+        question, degraded = await generate_next_question(
+            await aget_llm(GENERATION), conversation_state, job_title, experience, deadline
+        )
+        conversation_state.add_message(question)
+        return {"message": "Next question generated", "question": question, "degraded": degraded}
+    except HTTPException:
+        raise
+    except RETRY_LATER as e:
+        raise retry_later(e)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching next question: {str(e)}")
 
 
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def question_event_stream(state: MessagesState, message: str) -> AsyncIterator[str]:
+    """Server-sent events for the session's next question.
+
+    A question that is already available is sent whole. Otherwise model tokens are relayed
+    as "token" events while it is generated, and a "retry" event tells the client to discard
+    the text of an attempt that turned out to be a duplicate. The final "question" event
+    carries the canonical text, which is what the session records.
+    """
+    job_title = state.user_info.get("job_title", "").strip()
+    experience = state.user_info.get("experience", "").strip()
+    try:
+        item = await take_ready_question(state, job_title, experience)
+        if item is None:
+            async for kind, payload in astream_question(await aget_llm(GENERATION), state, job_title, experience):
+                if kind == "token":
+                    yield sse_event("token", payload)
+                elif kind == "retry":
+                    yield sse_event("retry", {})
+                else:
+                    item = payload
+            await store_in_bank(job_title, experience, item)
+        maybe_start_prefetch(state, job_title, experience)
+
+        question = item.render()
+        state.add_message(question)
+        yield sse_event("question", {"message": message, "question": question})
+    except RETRY_LATER as e:
+        yield sse_event("error", retry_later_event(e))
+    except Exception as e:
+        yield sse_event("error", {"detail": f"Error generating question: {str(e)}"})
+
+
+async def feedback_event_stream(state: MessagesState) -> AsyncIterator[str]:
+    try:
+        feedback_details = await aget_feedback_summary(state)
+        yield sse_event("feedback", {"complete": True, "feedback": feedback_details})
+    except RETRY_LATER as e:
+        yield sse_event("error", retry_later_event(e))
+    except Exception as e:
+        yield sse_event("error", {"detail": f"Error generating feedback: {str(e)}"})
+
+
+@router.post("/start/stream")
+async def start_interview_stream(user_input: UserInput):
+    conversation_state = open_session(user_input)
+    return StreamingResponse(
+        question_event_stream(conversation_state, "Interview started"), media_type="text/event-stream"
+    )
+
+
+@router.post("/next_question/stream")
+async def next_question_stream(user_response: UserResponse):
+    conversation_state = accept_answer(user_response)
+    if interview_complete(conversation_state):
+        events = feedback_event_stream(conversation_state)
+    else:
+        events = question_event_stream(conversation_state, "Next question generated")
+    return StreamingResponse(events, media_type="text/event-stream")
+
+
+async def feedback_item_stream(state: MessagesState) -> AsyncIterator[str]:
+    """Server-sent events: one "item" per graded answer as it completes, then the "summary"."""
+    try:
+        async for kind, payload in astream_feedback(state):
+            if kind == "item":
+                index, item = payload
+                yield sse_event("item", {"index": index, "feedback": item})
+            else:
+                yield sse_event("summary", {"complete": True, "feedback": payload})
+    except RETRY_LATER as e:
+        yield sse_event("error", retry_later_event(e))
+    except Exception as e:
+        yield sse_event("error", {"detail": f"Error generating feedback: {str(e)}"})
+
+
+@router.post("/get_feedback/stream")
+async def get_feedback_stream(feedback_request: FeedbackRequest):
+    conversation_state = get_session(feedback_request.candidate_id)
+
+    # Ensure enough questions have been answered
+    if len(conversation_state.user_answers) < conversation_state.total_questions:
+        raise HTTPException(status_code=400, detail="Not enough answers to provide feedback.")
+
+    return StreamingResponse(feedback_item_stream(conversation_state), media_type="text/event-stream")
+
+
+@router.websocket("/ws/interview")
+async def interview_socket(websocket: WebSocket):
+    """Run a whole interview over one connection.
+
+    Client messages: {"type": "start", ...UserInput fields}, {"type": "answer", "user_response": ...}
+    and {"type": "feedback"}. The server pushes "question", "verdict" (as each answer is graded),
+    "feedback" and "error" messages.
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    pushers: Set[asyncio.Task] = set()
+    conversation_state: Optional[MessagesState] = None
+
+    async def send(payload: dict) -> None:
+        # Verdict pushes run concurrently with the turn loop
+        async with send_lock:
+            await websocket.send_json(payload)
+
+    async def push_verdict(state: MessagesState, index: int) -> None:
+        task = state.grading_tasks.get(index)
+        if task is not None:
+            await asyncio.wait([task])
+        item = state.verdicts.get(index)
+        if item is not None:
+            await send({"type": "verdict", "index": index, "feedback": item})
+
+    async def send_question(state: MessagesState, message: str) -> None:
+        question, degraded = await generate_next_question(
+            await aget_llm(GENERATION), state, state.user_info["job_title"], state.user_info["experience"]
+        )
+        state.add_message(question)
+        await send({"type": "question", "message": message, "question": question, "degraded": degraded})
+
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                payload = json.loads(raw)
+                kind = payload.get("type") if isinstance(payload, dict) else None
+
+                if kind == "start":
+                    conversation_state = open_session(UserInput.model_validate(payload))
+                    await send_question(conversation_state, "Interview started")
+                elif conversation_state is None:
+                    await send({"type": "error", "status": 400, "detail": "Send a start message first."})
+                elif kind == "answer":
+                    accept_answer(UserResponse(
+                        candidate_id=conversation_state.user_info["candidate_id"],
+                        user_response=str(payload.get("user_response", "")),
+                    ))
+                    index = len(conversation_state.user_answers) - 1
+                    if index in conversation_state.verdicts:
+                        await push_verdict(conversation_state, index)
+                    elif index in conversation_state.grading_tasks:
+                        pusher = asyncio.create_task(push_verdict(conversation_state, index))
+                        pushers.add(pusher)
+                        pusher.add_done_callback(pushers.discard)
+
+                    if interview_complete(conversation_state):
+                        feedback_details = await aget_feedback_summary(conversation_state)
+                        await send({"type": "feedback", "complete": True, "feedback": feedback_details})
+                    else:
+                        await send_question(conversation_state, "Next question generated")
+                elif kind == "feedback":
+                    if not interview_complete(conversation_state):
+                        await send({"type": "error", "status": 400, "detail": "Not enough answers to provide feedback."})
+                    else:
+                        feedback_details = await aget_feedback_summary(conversation_state)
+                        await send({"type": "feedback", "complete": True, "feedback": feedback_details})
+                else:
+                    await send({"type": "error", "status": 400, "detail": f"Unknown message type: {kind}"})
+            except HTTPException as e:
+                await send({"type": "error", "status": e.status_code, "detail": e.detail})
+            except (json.JSONDecodeError, ValidationError) as e:
+                await send({"type": "error", "status": 422, "detail": f"Invalid message: {str(e)}"})
+            except WebSocketDisconnect:
+                raise
+            except RETRY_LATER as e:
+                await send({"type": "error", **retry_later_event(e)})
+            except Exception as e:
+                await send({"type": "error", "status": 500, "detail": f"Error processing message: {str(e)}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for pusher in list(pushers):
+            pusher.cancel()
+
+
 @router.post("/get_feedback")
-async def get_feedback():
+async def get_feedback(
+    feedback_request: FeedbackRequest, deadline: Deadline = Depends(request_deadline(FEEDBACK_DEADLINE_SECONDS))
+):
     try:
+        conversation_state = get_session(feedback_request.candidate_id)
+
         # Ensure enough questions have been answered
         if len(conversation_state.user_answers) < conversation_state.total_questions:
             raise HTTPException(
@@ -85,27 +431,180 @@ async def get_feedback():
             )
 
         # Generate feedback
-        feedback_details = score_and_provide_feedback(conversation_state)
+        feedback_details = await aget_feedback_summary(conversation_state, deadline)
 
         # Log the candidate feedback (optional: save to database here if required)
         print(f"Candidate Feedback for {conversation_state.user_info.get('candidate_id')}: {feedback_details}")
 
         return {"feedback": feedback_details}
+    except HTTPException:
+        raise
+    except RETRY_LATER as e:
+        raise retry_later(e)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating feedback: {str(e)}")
 
 
-def generate_next_question(
-    llm, state: MessagesState, job_title: str, experience: str
-) -> str:
+@router.get("/metrics")
+async def get_metrics():
+    counters = metrics.snapshot()
+    hits = counters.get("prefetch_hits", 0)
+    cache_hits = counters.get("llm_cache_memory_hits", 0) + counters.get("llm_cache_disk_hits", 0)
+    return {
+        "counters": counters,
+        "prefetch_hit_rate": ratio(hits, hits + counters.get("prefetch_misses", 0)),
+        "pool_hit_rate": ratio(
+            counters.get("pool_hits", 0), counters.get("pool_hits", 0) + counters.get("pool_misses", 0)
+        ),
+        "llm_cache_hit_rate": ratio(cache_hits, cache_hits + counters.get("llm_cache_misses", 0)),
+        "circuit_state": {task: breaker.state for task, breaker in circuit_breakers.items()},
+        "llm_tasks": {task: task_summary(counters, task) for task in (GENERATION, GRADING)},
+    }
+
+
+async def generate_next_question(
+    llm, state: MessagesState, job_title: str, experience: str, deadline: Optional[Deadline] = None
+) -> Tuple[str, bool]:
+    """Return the next question's text and whether it is a stored fallback served because generation was slow."""
     if not job_title:
         raise ValueError("Job title is missing. Ensure the user info includes a valid job title.")
 
-    # Always generate multiple-choice questions
-    question_type = "multiple-choice"
+    # Always serve multiple-choice questions; their answer keys stay on the server.
+    question_data = await within(
+        deadline, take_ready_question(state, job_title, experience, latency_budget(deadline))
+    )
+
+    # The prefetch outlasted the latency budget and nothing was pooled or banked: serve a curated
+    # question and leave the prefetch running for the next turn
+    degraded = False
+    if question_data is None and prefetch_pending(state, job_title, experience):
+        question_data = fallback_questions.sample(job_title, experience, partial(is_repeat, state))
+        if question_data is not None:
+            metrics.increment("degraded_responses")
+            record_question(state, question_data)
+            degraded = True
+        else:
+            metrics.increment("degraded_unavailable")
+            question_data = await within(deadline, atake_prefetched_question(state, job_title, experience))
+
+    # Generate several questions in one call and keep the rest for later turns
+    remaining = state.total_questions - len(state.questions)
+    if question_data is None and QUESTIONS_PER_CALL > 1 and remaining > 1:
+        for question in await afill_question_buffer(
+            llm, state, job_title, experience, min(QUESTIONS_PER_CALL, remaining), deadline
+        ):
+            await store_in_bank(job_title, experience, question)
+        question_data = take_buffered_question(state)
+
+    # Generate a unique multiple-choice question; a duplicate is replaced from the pool or bank
+    # when they have refilled in the meantime, instead of spending another LLM call
+    if question_data is None:
+        question_data, degraded = await agenerate_within_budget(llm, state, job_title, experience, deadline)
+        if not degraded:
+            # Already-banked text is ignored by the bank's unique index
+            await store_in_bank(job_title, experience, question_data)
+
+    maybe_start_prefetch(state, job_title, experience)
+    return question_data.render(), degraded
+
+
+async def agenerate_within_budget(
+    llm, state: MessagesState, job_title: str, experience: str, deadline: Optional[Deadline] = None
+) -> Tuple[MCQItem, bool]:
+    """Generate and record a new question, falling back to a stored one if generation is too slow.
+
+    A generation that misses the latency budget keeps running; its question is buffered for the
+    session's next turn and banked, so the call is not wasted.
+    """
+    live = asyncio.create_task(afind_unique_question(
+        llm, job_title, experience, state,
+        alternative=partial(take_stored_question, state, job_title, experience),
+        deadline=deadline,
+    ))
+    try:
+        budget = latency_budget(deadline)
+        if budget is not None:
+            done, _ = await asyncio.wait([live], timeout=budget)
+            if not done:
+                fallback = await take_fallback_question(state, job_title, experience)
+                if fallback is not None:
+                    metrics.increment("degraded_responses")
+                    record_question(state, fallback)
+                    live.add_done_callback(partial(keep_late_question, state, job_title, experience))
+                    return fallback, True
+                metrics.increment("degraded_unavailable")
+        question = await live
+    except BaseException:
+        live.cancel()
+        raise
+    record_question(state, question)
+    return question, False
+
+
+def latency_budget(deadline: Optional[Deadline] = None) -> Optional[float]:
+    """Seconds to wait on a question being generated before serving a stored one; None waits indefinitely."""
+    budget = GENERATION_LATENCY_BUDGET_SECONDS
+    if deadline is not None:
+        budget = min(budget, deadline.remaining()) if budget > 0 else deadline.remaining()
+    return budget if budget > 0 else None
+
 
-    # Generate a unique multiple-choice question
-    question_data = generate_question_with_llm(
-        llm, job_title, experience, question_type, state
+async def take_fallback_question(state: MessagesState, job_title: str, experience: str) -> Optional[MCQItem]:
+    """A question for the same job title and experience that needs no LLM call: pooled, banked or curated."""
+    return await take_stored_question(state, job_title, experience) or fallback_questions.sample(
+        job_title, experience, partial(is_repeat, state)
     )
+
+
+def keep_late_question(state: MessagesState, job_title: str, experience: str, task: asyncio.Task) -> None:
+    if task.cancelled() or task.exception() is not None:
+        return
+    question = task.result()
+    state.question_buffer.append(question)
+    stored = asyncio.create_task(store_in_bank(job_title, experience, question))
+    background_tasks.add(stored)
+    stored.add_done_callback(background_tasks.discard)
+
+
+async def take_stored_question(state: MessagesState, job_title: str, experience: str) -> Optional[MCQItem]:
+    """Serve a pre-generated question for this job title and experience when one is pooled,
+    otherwise reuse a question generated by an earlier run of the service. Does not record it."""
+    reject = partial(is_repeat, state)
+    question = question_pool.take(job_title, experience, reject) if QUESTION_POOL_ENABLED else None
+    if question is None and question_bank is not None:
+        question = await question_bank.sample(job_title, experience, reject)
+    return question
+
+
+async def take_ready_question(
+    state: MessagesState, job_title: str, experience: str, prefetch_timeout: Optional[float] = None
+) -> Optional[MCQItem]:
+    """Record and return a question that needs no new generation call, if there is one.
+
+    A prefetch still being generated is waited on for at most `prefetch_timeout` seconds.
+    """
+    # Questions left over from an earlier multi-question call cost nothing
+    question_data = take_buffered_question(state)
+
+    if question_data is None and state.prefetch_enabled and state.questions:
+        question_data = await atake_prefetched_question(state, job_title, experience, prefetch_timeout)
+        if question_data is not None:
+            await store_in_bank(job_title, experience, question_data)
+
+    if question_data is None:
+        question_data = await take_stored_question(state, job_title, experience)
+        if question_data is not None:
+            record_question(state, question_data)
+
     return question_data
+
+
+def maybe_start_prefetch(state: MessagesState, job_title: str, experience: str) -> None:
+    # Speculatively generate the following question while this one is answered; a prefetch
+    # that missed the latency budget is still running and serves the next turn instead
+    if prefetch_pending(state, job_title, experience):
+        return
+    if state.prefetch_enabled and not state.question_buffer and len(state.questions) < state.total_questions:
+        start_prefetch(state, job_title, experience)
@@ -1,11 +1,39 @@
-from langchain_core.messages import HumanMessage, AIMessage
-from typing import Optional, TypedDict, List, Set
-from app.config import llm
+import asyncio
+import hashlib
+from collections import deque
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypedDict, List, Set, Tuple, Union
+from langchain_core.exceptions import OutputParserException
+from pydantic import ValidationError
+from app.config import (
+    GRADING_CACHE_MAX_ENTRIES,
+    GRADING_CONCURRENCY,
+    GRADING_MODE,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+    LLM_COALESCING,
+    LLM_HEDGE_PERCENTILE,
+    LLM_MAX_HEDGES,
+    NEAR_DUPLICATE_THRESHOLD,
+)
+from app.deadlines import Deadline, DeadlineExceeded, within
+from app.dedup import NearDuplicateIndex
+from app.grading_cache import GradingCache
+from app.llm_factory import GENERATION, GRADING, PROFILES, aget_llm, provider_failures
+from app.mcq import AnswerWithholder, describe_answer, grade_locally, parse_mcq_text
+from app.metrics import metrics
+from app.models import AnswerVerdict, GeneratedQuestions, GradingReport, MCQItem
+from app.rate_limit import track_admission
+from app.resilience import CircuitBreaker, LatencyTracker, hedged
+from app.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, HumanMessage
 
 
 class MessagesState:
     def __init__(self):
-        self.messages: List[AIMessage | HumanMessage] = []
+        self.messages: List[Union["AIMessage", "HumanMessage"]] = []
         self.user_info: dict[str, str] = {}  # Include candidateId in user_info
         self.candidate_id: Optional[str] = None  # Explicitly store candidateId
         self.score: int = 0
@@ -14,6 +42,32 @@ class MessagesState:
         self.user_answers: List[str] = []
         self.correct_answers: List[str] = []
         self.asked_questions: Set[str] = set()  # Set for unique questions
+        self.questions: List[str] = []  # Questions in the order they were asked
+        self.items: List[Optional[MCQItem]] = []  # Answer keys, parallel to questions (None for free-text questions)
+        self.question_index = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD)  # Catches reworded repeats
+        self.question_buffer: Deque[MCQItem] = deque()  # Extra questions from multi-question generation calls
+        self.feedback: Optional["FeedbackSummary"] = None  # Last computed feedback, see feedback_digest
+        self.feedback_digest: Optional[str] = None  # Digest of the questions/answers self.feedback was graded from
+        self.last_active: float = 0.0  # Monotonic timestamp of the last request, used for idle eviction
+        self.verdicts: Dict[int, "FeedbackItem"] = {}  # Background grading results by answer index
+        self.grading_tasks: Dict[int, asyncio.Task] = {}  # In-flight background grading by answer index
+        self.prefetch_enabled: bool = False  # Generate question N+1 while the candidate answers question N
+        self.prefetch_task: Optional[asyncio.Task] = None  # Speculatively generated next question
+        self.prefetch_key: Optional[Tuple[str, str]] = None  # (job_title, experience) the prefetch was made for
+
+    def cancel_pending_tasks(self) -> None:
+        """Cancel background work owned by this session, e.g. when it is reset or evicted."""
+        for task in list(self.grading_tasks.values()):
+            task.cancel()
+        self.grading_tasks.clear()
+        discard_prefetch(self)
+
+    def add_message(self, content: str, from_candidate: bool = False) -> None:
+        """Append a turn to the interview transcript."""
+        # Imported on first use: langchain_core.messages adds ~130 ms to startup
+        from langchain_core.messages import AIMessage, HumanMessage
+
+        self.messages.append(HumanMessage(content=content) if from_candidate else AIMessage(content=content))
 
 
 class FeedbackItem(TypedDict):
@@ -21,6 +75,7 @@ class FeedbackItem(TypedDict):
     user_answer: str
     correct_answer: str
     is_correct: bool
+    explanation: str
 
 
 class FeedbackSummary(TypedDict):
@@ -30,116 +85,735 @@ class FeedbackSummary(TypedDict):
     final_feedback: str
 
 
-def generate_question_with_llm(
-    llm,
-    job_title: str,
-    experience: str,
-    question_type: str,
-    state: MessagesState
-) -> str:
-    prompt_modifier = (
+# Structured output the model returned but that does not fit the schema (e.g. answer key "E")
+MALFORMED_OUTPUT = (ValidationError, OutputParserException)
+
+# Identical structured LLM calls in flight at the same time share one request
+inflight_calls = SingleFlight()
+# Provider health and latency per task (generation, grading): each task may use its own model,
+# so slow generation calls must not set the hedge point for quick verdicts, nor a grading
+# outage open the circuit for generation
+circuit_breakers: Dict[str, CircuitBreaker] = {
+    task: CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS) for task in PROFILES
+}
+llm_latencies: Dict[str, LatencyTracker] = {task: LatencyTracker() for task in PROFILES}
+
+
+def record_call_error(task: str, error: BaseException) -> None:
+    """Report a failed LLM call to the task's circuit breaker; only provider failures count against it."""
+    circuit_breaker = circuit_breakers[task]
+    if isinstance(error, provider_failures()):
+        circuit_breaker.record_failure()
+    elif isinstance(error, MALFORMED_OUTPUT):
+        # The provider answered, just not with output that fits the schema
+        circuit_breaker.record_success()
+    else:
+        # Our own rate limit, a cancelled call or a bug of ours says nothing about the provider
+        circuit_breaker.record_cancelled()
+
+
+async def aguarded_call(task: str, call: Callable[[], Any]) -> Any:
+    """Run an LLM call behind the task's circuit breaker, hedging it once it runs slower than usual for the task."""
+    circuit_breaker = circuit_breakers[task]
+    circuit_breaker.before_call()
+    try:
+        if LLM_MAX_HEDGES > 0:
+            result = await hedged(call, llm_latencies[task], LLM_HEDGE_PERCENTILE, max_hedges=LLM_MAX_HEDGES)
+        else:
+            track_admission()
+            result = await call()
+    except BaseException as e:
+        record_call_error(task, e)
+        raise
+    circuit_breaker.record_success()
+    return result
+
+
+async def ainvoke_structured(
+    task: str, model, schema, prompt: str, coalesce: bool = True, deadline: Optional[Deadline] = None
+) -> Any:
+    """Structured call on `task`'s `model`; pass coalesce=False when each caller needs its own, distinct result.
+
+    The call is abandoned once `deadline` passes; a coalesced call keeps running for other waiters.
+    """
+    async def call():
+        return await model.with_structured_output(schema).ainvoke(prompt)
+
+    if not (coalesce and LLM_COALESCING):
+        return await within(deadline, aguarded_call(task, call))
+    return await within(
+        deadline, inflight_calls.do((id(model), schema.__name__, prompt), partial(aguarded_call, task, call))
+    )
+
+
+def check_retry_budget(task: str, deadline: Optional[Deadline]) -> None:
+    """Give up instead of starting another LLM call that typically could not finish in time."""
+    if deadline is None:
+        return
+    typical = llm_latencies[task].percentile(50) or 0.0
+    if deadline.remaining() <= typical:
+        metrics.increment("deadline_retries_skipped")
+        raise DeadlineExceeded("Request deadline exceeded.")
+
+
+def build_prompt_modifier(job_title: str, experience: str) -> str:
+    return (
         f"The questions must be strictly related to the job title '{job_title}' and the candidate's experience level ({experience}). "
         "Avoid generic, unrelated, or off-topic questions. Tailor the content to the technologies and challenges relevant to the job title."
     )
 
-    if question_type == "multiple-choice":
-        prompt = (
-            f"Generate a unique multiple-choice question for a {experience} professional applying for the position of '{job_title}'. "
-            f"Include 4 plausible options, and ensure the question is highly relevant to the job title. "
-            f"Only provide the question and options without revealing the answer or explanation. "
-            f"{prompt_modifier}"
-        )
-    elif question_type == "theoretical":
-        prompt = (
-            f"Generate a unique theoretical question for a {experience} professional applying for the position of '{job_title}'. "
-            f"Ensure the question explores advanced or critical aspects of the role. Do not reveal the answer or explanation. "
-            f"{prompt_modifier}"
-        )
-    else:
-        raise ValueError(f"Unsupported question type: {question_type}")
 
-    for _ in range(5):
-        response = llm.invoke([HumanMessage(content=prompt)])
-        question_content = response.content.strip()
+def build_mcq_prompt(job_title: str, experience: str) -> str:
+    return (
+        f"Generate a unique multiple-choice question for a {experience} professional applying for the position of '{job_title}'. "
+        f"Include 4 plausible options of which exactly one is correct, and ensure the question is highly relevant to the job title. "
+        f"Return the question stem, the 4 options without letter labels, and the letter (A-D) of the correct option as the answer key. "
+        f"{build_prompt_modifier(job_title, experience)}"
+    )
+
+
+def build_mcq_text_prompt(job_title: str, experience: str) -> str:
+    return (
+        f"Generate a unique multiple-choice question for a {experience} professional applying for the position of '{job_title}'. "
+        f"Include 4 plausible options of which exactly one is correct, and ensure the question is highly relevant to the job title. "
+        f"Write the question on the first line, then one line per option starting with A), B), C) and D), "
+        f"then a final line 'ANSWER: <letter>' naming the correct option. Do not add any explanation. "
+        f"{build_prompt_modifier(job_title, experience)}"
+    )
+
+
+def build_question_batch_prompt(job_title: str, experience: str, count: int) -> str:
+    return (
+        f"Generate {count} distinct multiple-choice questions for a {experience} professional applying for the position of '{job_title}'. "
+        f"Each question must cover a different topic, include 4 plausible options of which exactly one is correct, and be highly relevant to the job title. "
+        f"For each question, return the stem, the 4 options without letter labels, and the letter (A-D) of the correct option as the answer key. "
+        f"{build_prompt_modifier(job_title, experience)}"
+    )
+
+
+def is_repeat(state: MessagesState, question: Union[str, MCQItem]) -> bool:
+    """True if the session already asked this question or a near-identical rewording of it."""
+    if isinstance(question, MCQItem):
+        question = question.render()
+    if question in state.asked_questions:
+        metrics.increment("exact_duplicates_rejected")
+        return True
+    if state.question_index.contains_similar(question):
+        metrics.increment("near_duplicates_rejected")
+        return True
+    return False
+
+
+def record_question(state: MessagesState, question: Union[str, MCQItem]) -> str:
+    """Add a question to the session and return the text shown to the candidate."""
+    item = question if isinstance(question, MCQItem) else None
+    text = item.render() if item is not None else question
+    state.asked_questions.add(text)
+    state.questions.append(text)
+    state.items.append(item)
+    state.question_index.add(text)
+    return text
 
-        if question_content not in state.asked_questions:
-            state.asked_questions.add(question_content)
+
+async def agenerate_mcq(
+    llm, job_title: str, experience: str, deadline: Optional[Deadline] = None
+) -> Optional[MCQItem]:
+    """Generate one MCQ with its answer key in a single structured LLM call, independent of any session.
+
+    Never coalesced: concurrent callers with the same job title and experience each need a distinct question.
+    """
+    return await ainvoke_structured(GENERATION, llm, MCQItem, build_mcq_prompt(job_title, experience), False, deadline)
+
+
+async def afind_unique_question(
+    llm,
+    job_title: str,
+    experience: str,
+    state: MessagesState,
+    alternative: Optional[Callable[[], Awaitable[Optional[MCQItem]]]] = None,
+    deadline: Optional[Deadline] = None,
+) -> MCQItem:
+    """Generate a question not yet asked in this session, without recording it.
+
+    A duplicate, or structured output that fails validation, counts as a failed attempt. After a
+    duplicate, `alternative` (e.g. a pool or bank lookup) is tried before paying for another LLM
+    call; it must itself return only questions new to the session.
+    """
+    for attempt in range(5):
+        if attempt and alternative is not None:
+            question_content = await alternative()
+            if question_content is not None:
+                metrics.increment("retries_avoided")
+                return question_content
+        if attempt:
+            check_retry_budget(GENERATION, deadline)
+            metrics.increment("generation_retries")
+
+        try:
+            question_content = await agenerate_mcq(llm, job_title, experience, deadline)
+        except MALFORMED_OUTPUT:
+            metrics.increment("malformed_generations")
+            continue
+
+        if question_content is not None and not is_repeat(state, question_content):
             return question_content
 
     raise ValueError("Unable to generate a unique question after multiple attempts.")
 
 
-def score_and_provide_feedback(state: MessagesState) -> FeedbackSummary:
-    correct_answers = 0
-    total_questions = len(state.user_answers)
+def message_text(content: Any) -> str:
+    """Plain text of a message or chunk content, which may be a string or a list of parts."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content
+        if isinstance(part, (str, dict))
+    )
 
-    feedback_summary: FeedbackSummary = {
-        "correct_count": 0,
-        "total_questions": total_questions,
-        "details": [],
-        "final_feedback": "",
-    }
 
-    asked_questions_list = list(state.asked_questions)
+async def astream_question(
+    llm, state: MessagesState, job_title: str, experience: str
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Generate a question with token streaming.
 
-    for i in range(total_questions):
-        question = asked_questions_list[i] if i < len(asked_questions_list) else ""
-        user_answer = state.user_answers[i]
+    Yields ("token", text) as the model writes the question (the answer line is withheld),
+    ("retry", None) when an attempt is discarded as unparsable or a repeat, and finally
+    ("question", item) once the assembled question has been recorded on the session.
+    """
+    prompt = build_mcq_text_prompt(job_title, experience)
 
-        # Use LLM to validate the answer
-        validation_prompt = (
-            f"Question: {question}\n"
-            f"User Answer: {user_answer}\n"
-            "Is the user's answer correct or incorrect? Provide a brief explanation and the correct answer."
-        )
-        response = llm.invoke([HumanMessage(content=validation_prompt)])
+    for attempt in range(5):
+        if attempt:
+            metrics.increment("generation_retries")
+            yield "retry", None
+
+        parts: List[str] = []
+        withholder = AnswerWithholder()
+        # Tokens are relayed as they arrive, so streams are not hedged; the breaker still applies
+        circuit_breaker = circuit_breakers[GENERATION]
+        circuit_breaker.before_call()
+        track_admission()
+        try:
+            async for chunk in llm.astream(prompt):
+                text = message_text(chunk.content)
+                parts.append(text)
+                visible = withholder.feed(text)
+                if visible:
+                    yield "token", visible
+        except BaseException as e:
+            record_call_error(GENERATION, e)
+            raise
+        circuit_breaker.record_success()
+        visible = withholder.flush()
+        if visible:
+            yield "token", visible
+
+        item = parse_mcq_text("".join(parts))
+        if item is None:
+            metrics.increment("stream_parse_failures")
+            continue
+        if not is_repeat(state, item):
+            record_question(state, item)
+            yield "question", item
+            return
+
+    raise ValueError("Unable to generate a unique question after multiple attempts.")
+
+
+async def agenerate_question_batch(
+    llm, job_title: str, experience: str, count: int, deadline: Optional[Deadline] = None
+) -> List[MCQItem]:
+    """Generate up to `count` questions with a single structured LLM call."""
+    try:
+        # Not coalesced, for the same reason as agenerate_mcq
+        prompt = build_question_batch_prompt(job_title, experience, count)
+        result = await ainvoke_structured(GENERATION, llm, GeneratedQuestions, prompt, False, deadline)
+    except MALFORMED_OUTPUT:
+        # One bad item fails the whole batch; the caller generates a single question instead
+        metrics.increment("malformed_generations")
+        return []
+    if result is None:
+        return []
+    return result.questions[:count]
+
+
+async def afill_question_buffer(
+    llm, state: MessagesState, job_title: str, experience: str, count: int, deadline: Optional[Deadline] = None
+) -> List[MCQItem]:
+    """Generate a batch of questions into the session buffer; returns the ones buffered."""
+    metrics.increment("question_batches")
+    batch_index = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD)
+    buffered = []
+    for question in await agenerate_question_batch(llm, job_title, experience, count, deadline):
+        # Skip repeats of the session and of earlier items in the same batch
+        if is_repeat(state, question) or not batch_index.add(question.render()):
+            continue
+        state.question_buffer.append(question)
+        buffered.append(question)
+    metrics.increment("questions_buffered", len(buffered))
+    return buffered
+
+
+def take_buffered_question(state: MessagesState) -> Optional[MCQItem]:
+    """Pop and record the next buffered question that is still new to the session."""
+    while state.question_buffer:
+        question = state.question_buffer.popleft()
+        if not is_repeat(state, question):
+            record_question(state, question)
+            metrics.increment("buffer_hits")
+            return question
+    return None
+
+
+def start_prefetch(state: MessagesState, job_title: str, experience: str, llm=None) -> None:
+    """Begin generating the session's next question in the background, by default with the generation model."""
+    async def prefetch():
+        return await afind_unique_question(llm or await aget_llm(GENERATION), job_title, experience, state)
+
+    discard_prefetch(state)
+    state.prefetch_key = (job_title, experience)
+    state.prefetch_task = asyncio.create_task(prefetch())
+    metrics.increment("prefetch_started")
+
+
+def discard_prefetch(state: MessagesState) -> None:
+    """Invalidate the pending prefetch, if any; it counts as a wasted generation."""
+    task = state.prefetch_task
+    state.prefetch_task = None
+    state.prefetch_key = None
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        # Retrieve the outcome so a failed prefetch is not reported as never retrieved
+        task.exception()
+    metrics.increment("prefetch_wasted")
+
+
+def prefetch_pending(state: MessagesState, job_title: str, experience: str) -> bool:
+    """True if a prefetch for this job title and experience is still being generated."""
+    task = state.prefetch_task
+    return task is not None and not task.done() and state.prefetch_key == (job_title, experience)
+
+
+async def atake_prefetched_question(
+    state: MessagesState, job_title: str, experience: str, timeout: Optional[float] = None
+) -> Optional[MCQItem]:
+    """Claim the prefetched question and record it, or return None if there is no usable one.
+
+    A prefetch still running after `timeout` seconds is left in place for a later turn.
+    """
+    task = state.prefetch_task
+    if task is None:
+        metrics.increment("prefetch_misses")
+        return None
+    if state.prefetch_key != (job_title, experience):
+        discard_prefetch(state)
+        metrics.increment("prefetch_misses")
+        return None
+
+    if not task.done():
+        metrics.increment("prefetch_waited")
+        done, _ = await asyncio.wait([task], timeout=timeout)
+        if not done:
+            metrics.increment("prefetch_late")
+            return None
+    if state.prefetch_task is not task:
+        # Claimed or replaced by another request while we waited
+        metrics.increment("prefetch_misses")
+        return None
+    state.prefetch_task = None
+    state.prefetch_key = None
+    try:
+        question_content = task.result()
+    except (asyncio.CancelledError, Exception):
+        question_content = None
 
-        # Handle the LLM response properly
-        feedback = extract_feedback_from_response(response)
+    # The session may have asked the same question since the prefetch was generated
+    if question_content is None or is_repeat(state, question_content):
+        metrics.increment("prefetch_wasted")
+        metrics.increment("prefetch_misses")
+        return None
 
-        # Parse the LLM response to determine correctness
-        is_correct = "correct" in feedback.lower() and "incorrect" not in feedback.lower()
-        correct_answer = extract_correct_answer(feedback)
+    metrics.increment("prefetch_hits")
+    record_question(state, question_content)
+    return question_content
 
-        # Prepare feedback item
-        feedback_item: FeedbackItem = {
+
+# A multiple-choice question's stored key is authoritative: the model only decides whether
+# the candidate's wording means that option
+KNOWN_ANSWER_NOTE = "Where a correct answer is given, it is final: only judge whether the user's answer means it."
+
+
+def build_validation_prompt(question: str, user_answer: str, correct_answer: Optional[str] = None) -> str:
+    known = f"Correct Answer: {correct_answer}\n{KNOWN_ANSWER_NOTE}\n" if correct_answer else ""
+    return (
+        f"Question: {question}\n"
+        f"User Answer: {user_answer}\n"
+        f"{known}"
+        "Is the user's answer correct or incorrect? Provide a brief explanation and the correct answer."
+    )
+
+
+def build_batch_grading_prompt(
+    pairs: List[Tuple[str, str]], correct_answers: Optional[List[Optional[str]]] = None
+) -> str:
+    correct_answers = correct_answers or [None] * len(pairs)
+    items = "\n\n".join(
+        f"Item {index}\nQuestion: {question}\nUser Answer: {user_answer}"
+        + (f"\nCorrect Answer: {correct_answer}" if correct_answer else "")
+        for index, ((question, user_answer), correct_answer) in enumerate(zip(pairs, correct_answers))
+    )
+    return (
+        "Grade each of the candidate's answers below. For every item, return its index, "
+        "whether the user's answer is correct, the correct answer and a brief explanation. "
+        f"{KNOWN_ANSWER_NOTE}\n\n"
+        f"{items}"
+    )
+
+
+def build_feedback_item(
+    question: str, user_answer: str, verdict: Optional[AnswerVerdict], correct_answer: Optional[str] = None
+) -> FeedbackItem:
+    if verdict is None:
+        return {
             "question": question,
             "user_answer": user_answer,
-            "correct_answer": correct_answer if correct_answer else "Not provided",
-            "is_correct": is_correct,
+            "correct_answer": correct_answer or "Not provided",
+            "is_correct": False,
+            "explanation": "Unable to determine correctness. Please try again.",
         }
 
-        feedback_summary["details"].append(feedback_item)
+    return {
+        "question": question,
+        "user_answer": user_answer,
+        "correct_answer": correct_answer or verdict.correct_answer.strip() or "Not provided",
+        "is_correct": verdict.is_correct,
+        "explanation": verdict.explanation.strip(),
+    }
+
+
+# Verdicts shared across sessions; the same answer to the same question is only graded once
+grading_cache = GradingCache(GRADING_CACHE_MAX_ENTRIES) if GRADING_CACHE_MAX_ENTRIES > 0 else None
+
+
+def lookup_grading_cache(question: str, user_answer: str) -> Optional[FeedbackItem]:
+    verdict = grading_cache.get(question, user_answer) if grading_cache is not None else None
+    if verdict is None:
+        return None
+    return {"question": question, "user_answer": user_answer, **verdict}
+
+
+def record_verdict(
+    question: str, user_answer: str, verdict: Optional[AnswerVerdict], correct_answer: Optional[str] = None
+) -> FeedbackItem:
+    """Build the feedback item for an LLM verdict and share it through the grading cache."""
+    item = build_feedback_item(question, user_answer, verdict, correct_answer)
+    if verdict is not None and grading_cache is not None:
+        grading_cache.put(question, user_answer, {
+            "correct_answer": item["correct_answer"],
+            "is_correct": item["is_correct"],
+            "explanation": item["explanation"],
+        })
+    return item
+
 
-        if is_correct:
-            correct_answers += 1
+def summarize_feedback(details: List[FeedbackItem]) -> FeedbackSummary:
+    total_questions = len(details)
+    correct_answers = sum(1 for item in details if item["is_correct"])
 
-    # Update feedback summary
-    feedback_summary["correct_count"] = correct_answers
-    feedback_summary["final_feedback"] = (
-        f"Congratulations! You answered {correct_answers} out of {total_questions} correctly. "
-        f"Keep up the good work!" if correct_answers >= 6 else
-        f"You answered {correct_answers} out of {total_questions} correctly. "
-        f"Review the questions and improve your knowledge!"
+    return {
+        "correct_count": correct_answers,
+        "total_questions": total_questions,
+        "details": details,
+        "final_feedback": (
+            f"Congratulations! You answered {correct_answers} out of {total_questions} correctly. "
+            f"Keep up the good work!" if correct_answers >= 6 else
+            f"You answered {correct_answers} out of {total_questions} correctly. "
+            f"Review the questions and improve your knowledge!"
+        ),
+    }
+
+
+def question_answer_pairs(state: MessagesState) -> List[Tuple[str, str]]:
+    """Pair each answer with the question it was given for, in asking order."""
+    return [
+        (state.questions[i] if i < len(state.questions) else "", user_answer)
+        for i, user_answer in enumerate(state.user_answers)
+    ]
+
+
+def known_answer(state: MessagesState, index: int) -> Optional[str]:
+    """The stored answer key of question `index`, as shown to the candidate, or None for free-text questions."""
+    item = state.items[index] if index < len(state.items) else None
+    return describe_answer(item) if item is not None else None
+
+
+def verdicts_by_index(report: Optional[GradingReport], count: int) -> List[Optional[AnswerVerdict]]:
+    """Line up a batched grading report with the items it was asked to grade."""
+    verdicts: List[Optional[AnswerVerdict]] = [None] * count
+    for verdict in report.verdicts if report is not None else []:
+        if 0 <= verdict.index < count and verdicts[verdict.index] is None:
+            verdicts[verdict.index] = verdict
+    return verdicts
+
+
+def grade_with_answer_key(state: MessagesState, index: int) -> Optional[FeedbackItem]:
+    """Grade answer `index` locally against the stored answer key, if the answer is unambiguous."""
+    item = state.items[index] if index < len(state.items) else None
+    if item is None or index >= len(state.user_answers):
+        return None
+
+    user_answer = state.user_answers[index]
+    is_correct = grade_locally(item, user_answer)
+    if is_correct is None:
+        metrics.increment("local_grading_ambiguous")
+        return None
+
+    metrics.increment("local_grading_hits")
+    return {
+        "question": state.questions[index],
+        "user_answer": user_answer,
+        "correct_answer": describe_answer(item),
+        "is_correct": is_correct,
+        "explanation": "Graded against the stored answer key.",
+    }
+
+
+async def _allm_grade_answer(
+    question: str, user_answer: str, deadline: Optional[Deadline] = None, correct_answer: Optional[str] = None
+) -> FeedbackItem:
+    prompt = build_validation_prompt(question, user_answer, correct_answer)
+    verdict = await ainvoke_structured(GRADING, await aget_llm(GRADING), AnswerVerdict, prompt, deadline=deadline)
+    return record_verdict(question, user_answer, verdict, correct_answer)
+
+
+async def agrade_answer(question: str, user_answer: str, correct_answer: Optional[str] = None) -> FeedbackItem:
+    return lookup_grading_cache(question, user_answer) or await _allm_grade_answer(
+        question, user_answer, correct_answer=correct_answer
     )
 
-    return feedback_summary
 
+async def agrade_pairs(
+    pairs: List[Tuple[str, str]],
+    max_concurrency: int = GRADING_CONCURRENCY,
+    mode: str = GRADING_MODE,
+    deadline: Optional[Deadline] = None,
+    correct_answers: Optional[List[Optional[str]]] = None,
+) -> List[FeedbackItem]:
+    """Grade question/answer pairs, either in one structured batch call or concurrently one call per answer.
+
+    Per-answer calls are capped at max_concurrency in flight; results are always in input order.
+    `correct_answers`, parallel to `pairs`, gives the stored answer key of multiple-choice questions.
+    """
+    correct_answers = correct_answers or [None] * len(pairs)
+    cached: List[Optional[FeedbackItem]] = [lookup_grading_cache(*pair) for pair in pairs]
+    missing = [index for index, item in enumerate(cached) if item is None]
+    verdicts: List[Optional[AnswerVerdict]] = [None] * len(pairs)
 
-def extract_feedback_from_response(response) -> str:
-    """Extract feedback content from the LLM response."""
-    if isinstance(response, list) and len(response) > 0:
-        return response[0]["content"].strip() if "content" in response[0] else response[0].strip()
-    elif isinstance(response, dict) and "content" in response:
-        return response["content"].strip()
-    elif isinstance(response, str):
-        return response.strip()
+    if mode == "batched" and missing:
+        prompt = build_batch_grading_prompt(
+            [pairs[index] for index in missing], [correct_answers[index] for index in missing]
+        )
+        report = await ainvoke_structured(GRADING, await aget_llm(GRADING), GradingReport, prompt, deadline=deadline)
+        for index, verdict in zip(missing, verdicts_by_index(report, len(missing))):
+            verdicts[index] = verdict
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def grade(index: int) -> FeedbackItem:
+        question, user_answer = pairs[index]
+        if cached[index] is not None:
+            return cached[index]
+        if verdicts[index] is not None:
+            return record_verdict(question, user_answer, verdicts[index], correct_answers[index])
+        async with semaphore:
+            return await _allm_grade_answer(question, user_answer, deadline, correct_answers[index])
+
+    # gather keeps results in input order regardless of completion order
+    return list(await asyncio.gather(*(grade(index) for index in range(len(pairs)))))
+
+
+async def _grade_in_background(state: MessagesState, index: int, question: str, user_answer: str) -> None:
+    try:
+        state.verdicts[index] = await agrade_answer(question, user_answer, known_answer(state, index))
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        # Leave the verdict missing; ascore_and_provide_feedback grades it inline
+        pass
+
+
+def schedule_background_grading(state: MessagesState, index: int) -> None:
+    """Start grading answer `index` while the candidate works on the next question."""
+    pairs = question_answer_pairs(state)
+    if index >= len(pairs) or index in state.verdicts or index in state.grading_tasks:
+        return
+    # MCQ answers with a stored key are graded on the spot, without an LLM call
+    local = grade_with_answer_key(state, index)
+    if local is not None:
+        state.verdicts[index] = local
+        return
+    question, user_answer = pairs[index]
+    task = asyncio.create_task(_grade_in_background(state, index, question, user_answer))
+    state.grading_tasks[index] = task
+
+    def forget(done: asyncio.Task) -> None:
+        if state.grading_tasks.get(index) is done:
+            del state.grading_tasks[index]
+
+    task.add_done_callback(forget)
+
+
+async def aiter_graded_answers(
+    state: MessagesState,
+    max_concurrency: int = GRADING_CONCURRENCY,
+    mode: str = GRADING_MODE,
+    deadline: Optional[Deadline] = None,
+) -> AsyncIterator[Tuple[int, FeedbackItem]]:
+    """Yield (index, item) for every answer as soon as its grade is known.
+
+    Verdicts already produced locally or in the background come first; the rest follow in
+    completion order as background tasks finish and missing items are graded. Every item is
+    also stored in state.verdicts.
+    """
+    pairs = question_answer_pairs(state)
+
+    def known(index: int) -> Optional[FeedbackItem]:
+        item = state.verdicts.get(index)
+        if item is not None and (item["question"], item["user_answer"]) != pairs[index]:
+            item = None
+        if item is None:
+            item = grade_with_answer_key(state, index)
+        if item is not None:
+            state.verdicts[index] = item
+        return item
+
+    waiting: Dict[int, asyncio.Task] = {}
+    missing: List[int] = []
+    for index in range(len(pairs)):
+        item = known(index)
+        if item is not None:
+            yield index, item
+        elif index in state.grading_tasks:
+            waiting[index] = state.grading_tasks[index]
+        else:
+            missing.append(index)
+
+    if not waiting and not missing:
+        return
+
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def finish_background(index: int, task: asyncio.Task) -> None:
+        await asyncio.wait([task], timeout=deadline.remaining() if deadline is not None else None)
+        item = known(index)
+        if item is None:
+            # Background grading failed; grade it inline
+            item = (await agrade_pairs([pairs[index]], 1, "per_item", deadline, [known_answer(state, index)]))[0]
+        results.put_nowait((index, item))
+
+    async def finish_missing(indexes: List[int], batch_mode: str) -> None:
+        correct_answers = [known_answer(state, index) for index in indexes]
+        graded = await agrade_pairs([pairs[index] for index in indexes], 1, batch_mode, deadline, correct_answers)
+        for index, item in zip(indexes, graded):
+            results.put_nowait((index, item))
+
+    async def report_errors(coroutine) -> None:
+        try:
+            await coroutine
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            results.put_nowait((None, e))
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def limited(coroutine):
+        async with semaphore:
+            await coroutine
+
+    workers = [asyncio.create_task(report_errors(finish_background(index, task))) for index, task in waiting.items()]
+    if mode == "batched" and missing:
+        workers.append(asyncio.create_task(report_errors(finish_missing(missing, mode))))
     else:
-        return "Unable to determine correctness. Please try again."
+        workers.extend(
+            asyncio.create_task(report_errors(limited(finish_missing([index], "per_item")))) for index in missing
+        )
+
+    try:
+        for _ in range(len(waiting) + len(missing)):
+            index, item = await results.get()
+            if index is None:
+                raise item
+            state.verdicts[index] = item
+            yield index, item
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+
+async def ascore_and_provide_feedback(
+    state: MessagesState,
+    max_concurrency: int = GRADING_CONCURRENCY,
+    mode: str = GRADING_MODE,
+    deadline: Optional[Deadline] = None,
+) -> FeedbackSummary:
+    """Grade all answers in question order, reusing verdicts already produced in the background."""
+    details: List[Optional[FeedbackItem]] = [None] * len(state.user_answers)
+    async for index, item in aiter_graded_answers(state, max_concurrency, mode, deadline):
+        details[index] = item
+    return summarize_feedback([item for item in details if item is not None])
 
 
-def extract_correct_answer(feedback: str) -> Optional[str]:
-    """Extract the correct answer from the feedback content if available."""
-    if "correct answer:" in feedback.lower():
-        return feedback.split("Correct answer:")[-1].strip()
+def answers_digest(state: MessagesState) -> str:
+    """Fingerprint of everything grading depends on, used to key the memoized feedback."""
+    digest = hashlib.sha256()
+    for question, user_answer in question_answer_pairs(state):
+        digest.update(question.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(user_answer.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def cached_feedback(state: MessagesState, digest: str) -> Optional[FeedbackSummary]:
+    if state.feedback is not None and state.feedback_digest == digest:
+        return state.feedback
     return None
+
+
+async def aget_feedback_summary(state: MessagesState, deadline: Optional[Deadline] = None) -> FeedbackSummary:
+    """Return the session's feedback, grading only if the answers changed since the last run."""
+    digest = answers_digest(state)
+    feedback = cached_feedback(state, digest)
+    if feedback is not None:
+        return feedback
+
+    feedback = await ascore_and_provide_feedback(state, deadline=deadline)
+    state.feedback = feedback
+    state.feedback_digest = digest
+    return feedback
+
+
+async def astream_feedback(state: MessagesState) -> AsyncIterator[Tuple[str, Any]]:
+    """Progressive feedback: ("item", (index, FeedbackItem)) as each verdict completes, then ("summary", FeedbackSummary)."""
+    digest = answers_digest(state)
+    feedback = cached_feedback(state, digest)
+    if feedback is not None:
+        for index, item in enumerate(feedback["details"]):
+            yield "item", (index, item)
+        yield "summary", feedback
+        return
+
+    details: List[Optional[FeedbackItem]] = [None] * len(state.user_answers)
+    async for index, item in aiter_graded_answers(state):
+        details[index] = item
+        yield "item", (index, item)
+
+    feedback = summarize_feedback([item for item in details if item is not None])
+    state.feedback = feedback
+    state.feedback_digest = digest
+    yield "summary", feedback
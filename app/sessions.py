@@ -0,0 +1,80 @@
+# app/sessions.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+from zlib import crc32
+
+from app.services import MessagesState
+
+
+class _Shard:
+    def __init__(self, capacity: int):
+        self.lock = threading.Lock()
+        # Insertion order doubles as idle order: every access moves the entry to the end
+        self.sessions: "OrderedDict[str, MessagesState]" = OrderedDict()
+        self.capacity = capacity
+
+
+class SessionStore:
+    """Concurrent candidate_id -> MessagesState map with idle expiry and a size cap."""
+
+    def __init__(
+        self,
+        shards: int = 16,
+        ttl_seconds: float = 1800.0,
+        max_sessions: int = 50000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if shards < 1:
+            raise ValueError("Session store needs at least one shard.")
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._clock = clock
+        per_shard = max(1, -(-max_sessions // shards))
+        self._shards: List[_Shard] = [_Shard(per_shard) for _ in range(shards)]
+
+    def _shard_for(self, key: str) -> _Shard:
+        return self._shards[crc32(key.encode("utf-8")) % len(self._shards)]
+
+    def _evict(self, shard: _Shard, now: float) -> None:
+        # Caller holds shard.lock; the oldest entries sit at the front
+        while shard.sessions:
+            key, state = next(iter(shard.sessions.items()))
+            if len(shard.sessions) <= shard.capacity and now - state.last_active < self.ttl_seconds:
+                break
+            del shard.sessions[key]
+            state.cancel_pending_tasks()
+
+    def create(self, candidate_id: str) -> MessagesState:
+        """Start a fresh session, replacing any existing one for the same candidate."""
+        shard = self._shard_for(candidate_id)
+        now = self._clock()
+        state = MessagesState()
+        state.candidate_id = candidate_id
+        state.last_active = now
+        with shard.lock:
+            previous = shard.sessions.pop(candidate_id, None)
+            if previous is not None:
+                previous.cancel_pending_tasks()
+            shard.sessions[candidate_id] = state
+            self._evict(shard, now)
+        return state
+
+    def get(self, candidate_id: str) -> Optional[MessagesState]:
+        shard = self._shard_for(candidate_id)
+        now = self._clock()
+        with shard.lock:
+            state = shard.sessions.get(candidate_id)
+            if state is None:
+                return None
+            if now - state.last_active >= self.ttl_seconds:
+                del shard.sessions[candidate_id]
+                state.cancel_pending_tasks()
+                return None
+            state.last_active = now
+            shard.sessions.move_to_end(candidate_id)
+            return state
+
+    def __len__(self) -> int:
+        return sum(len(shard.sessions) for shard in self._shards)
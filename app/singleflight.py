@@ -0,0 +1,49 @@
+# app/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from app.metrics import metrics
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight call whose result they all share.
+
+    The call runs in its own task, so one caller going away does not fail the others; it is only
+    cancelled once every caller waiting on it has been cancelled. Keys are forgotten as soon as the
+    call finishes, so later callers start a fresh call.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(call())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            metrics.increment("singleflight_calls")
+
+            def forget(done: asyncio.Task) -> None:
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+                    del self._waiters[key]
+
+            task.add_done_callback(forget)
+        else:
+            metrics.increment("singleflight_shared")
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._calls.get(key) is task and self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,87 @@
+# benchmarks/startup_time.py
+"""Cold-start import budget for the API.
+
+Imports `main` in fresh interpreters with `-X importtime` and fails (exit 1)
+when the median import time exceeds the budget or a heavy module that should
+be deferred until first use is loaded at startup.
+
+    python benchmarks/startup_time.py [--budget-ms 1000] [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must only be imported when a model is first built or a transcript is first written
+DEFERRED_MODULES = (
+    "langchain_google_genai",
+    "google.genai",
+    "google.generativeai",
+    "grpc",
+    "langchain_core.messages",
+    "langchain_core.outputs",
+)
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def import_profile() -> dict:
+    """Import `main` in a fresh interpreter and return {module: cumulative µs}."""
+    env = dict(os.environ, LLM_BACKEND="fake")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"importing main failed:\n{result.stderr[-2000:]}")
+    profile = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            profile[match.group(4)] = int(match.group(2))
+    return profile
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "1000")))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    # One untimed run so bytecode compilation is not charged to the first sample
+    import_profile()
+    profiles = [import_profile() for _ in range(args.runs)]
+    samples = sorted(profile["main"] / 1000 for profile in profiles)
+    median_ms = statistics.median(samples)
+
+    print(f"import main: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(min {samples[0]:.0f}, max {samples[-1]:.0f}), budget {args.budget_ms:.0f} ms")
+    # Top-level packages only: nested entries are already included in their parent's cumulative time
+    last = profiles[-1]
+    roots = {name: us for name, us in last.items() if "." not in name and name != "main"}
+    print("\nslowest top-level imports:")
+    for name, us in sorted(roots.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = [name for name in DEFERRED_MODULES if any(name in profile for profile in profiles)]
+    if eager:
+        print(f"\nFAIL: imported at startup but should be deferred: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\nFAIL: median import time {median_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
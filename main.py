@@ -1,8 +1,40 @@
 # main.py
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routes import router  # Import your routes module
+from app import llm_factory
+from app.config import LLM_PRELOAD, QUESTION_POOL_ENABLED, QUESTION_POOL_PREWARM
+from app.metrics import metrics
+from app.question_pool import parse_prewarm_keys
+from app.routes import question_bank, question_pool, router  # Import your routes module
+
+
+async def warm_up() -> None:
+    # Load the LLM SDK in a worker thread so the server accepts requests while it imports
+    if LLM_PRELOAD:
+        try:
+            await asyncio.to_thread(llm_factory.preload)
+        except Exception:
+            # Surfaces again, with its message, on the first request that needs a model
+            metrics.increment("llm_preload_errors")
+    # Start filling the question pool for the most common job titles
+    if QUESTION_POOL_ENABLED:
+        question_pool.warm(parse_prewarm_keys(QUESTION_POOL_PREWARM))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup = asyncio.create_task(warm_up())
+    yield
+    startup.cancel()
+    question_pool.close()
+    if question_bank is not None:
+        question_bank.close()
+    llm_factory.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Include routes
 app.include_router(router)
@@ -0,0 +1,11 @@
+import os
+
+# Settings are read when app.config is first imported: run offline, keep every store in memory and
+# share no LLM response cache between tests
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["LLM_PRELOAD"] = "false"
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["LLM_CACHE_PATH"] = ""
+os.environ["QUESTION_BANK_PATH"] = ""
+os.environ["FALLBACK_QUESTIONS_PATH"] = ""
+os.environ["QUESTION_POOL_ENABLED"] = "false"
@@ -0,0 +1,21 @@
+import pytest
+
+from app.deadlines import parse_timeout
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("5", 5.0),
+    ("2.5", 2.5),
+    ("120", 30.0),
+    (None, 10.0),
+    ("", 10.0),
+    ("soon", 10.0),
+    ("0", 10.0),
+    ("-3", 10.0),
+    ("nan", 10.0),
+    ("NaN", 10.0),
+    ("inf", 10.0),
+    ("-inf", 10.0),
+])
+def test_parse_timeout(value, expected):
+    assert parse_timeout(value, default=10.0, maximum=30.0) == expected
@@ -0,0 +1,38 @@
+from app.dedup import MinHasher, NearDuplicateIndex, shingles, similarity
+
+QUESTION = "Which HTTP status code tells a client that it must authenticate before the request can succeed?"
+
+
+def test_shingles_ignore_case_punctuation_and_spacing():
+    assert shingles(QUESTION) == shingles("  which http STATUS code, tells a client that it must "
+                                          "authenticate before the request can succeed ")
+
+
+def test_identical_texts_have_identical_signatures():
+    hasher = MinHasher()
+    assert similarity(hasher.signature(QUESTION), hasher.signature(QUESTION)) == 1.0
+
+
+def test_rewording_is_caught():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add(QUESTION)
+    reworded = "Which HTTP status code tells a client that it must authenticate before the request can succeed at all?"
+    assert index.contains_similar(reworded)
+    assert not index.add(reworded)
+    assert len(index) == 1
+
+
+def test_different_question_is_not_a_duplicate():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add(QUESTION)
+    other = "What is the average-case time complexity of looking up a key in a hash table?"
+    assert not index.contains_similar(other)
+    assert index.add(other)
+    assert len(index) == 2
+
+
+def test_short_texts_are_compared_whole():
+    index = NearDuplicateIndex()
+    index.add("Explain REST")
+    assert index.contains_similar("explain rest!")
+    assert not index.contains_similar("Explain SOAP")
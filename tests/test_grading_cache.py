@@ -0,0 +1,20 @@
+from app.grading_cache import GradingCache, grading_key
+
+QUESTION = "Which language added templates first?\nA) C++\nB) Java\nC) Go\nD) Rust"
+VERDICT = {"correct_answer": "A) C++", "is_correct": True, "explanation": "Templates date from 1990."}
+
+
+def test_option_letter_and_text_share_a_key():
+    assert len({grading_key(QUESTION, answer) for answer in ["a", "A)", "(a)", "C++", "  c++ "]}) == 1
+
+
+def test_symbols_are_part_of_free_text_keys():
+    assert grading_key(QUESTION, "c#") != grading_key(QUESTION, "c")
+    assert grading_key("Is C# managed?", "yes") != grading_key("Is C++ managed?", "yes")
+
+
+def test_verdict_is_shared_by_equivalent_answers_only():
+    cache = GradingCache(max_entries=10)
+    cache.put(QUESTION, "a", VERDICT)
+    assert cache.get(QUESTION, "C++") == VERDICT
+    assert cache.get(QUESTION, "c#") is None
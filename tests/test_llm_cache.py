@@ -0,0 +1,82 @@
+import types
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from app import llm_cache
+from app.llm_cache import TieredLLMCache
+
+LLM = "fake-interviewer"
+USAGE = {"input_tokens": 12, "output_tokens": 5, "total_tokens": 17}
+
+
+def response(text: str):
+    return [ChatGeneration(message=AIMessage(content=text, usage_metadata=USAGE))]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(llm_cache, "time", types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = TieredLLMCache(max_entries=10, ttl_seconds=100, sqlite_path=str(tmp_path / "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = TieredLLMCache(ttl_seconds=100)
+    cache.update("prompt", LLM, response("answer"))
+    clock.now += 99
+    assert cache.lookup("prompt", LLM)[0].message.content == "answer"
+    clock.now += 1
+    assert cache.lookup("prompt", LLM) is None
+
+
+def test_memory_tier_evicts_the_least_recently_used(clock):
+    cache = TieredLLMCache(max_entries=2)
+    cache.update("first", LLM, response("1"))
+    cache.update("second", LLM, response("2"))
+    cache.lookup("first", LLM)
+    cache.update("third", LLM, response("3"))
+    assert cache.lookup("second", LLM) is None
+    assert cache.lookup("first", LLM) is not None
+    assert cache.lookup("third", LLM) is not None
+
+
+def test_disk_hit_is_promoted_with_its_original_expiry(clock, disk_cache):
+    disk_cache.update("prompt", LLM, response("answer"))
+    disk_cache._memory.clear()
+    clock.now += 60
+    assert disk_cache.lookup("prompt", LLM)[0].message.content == "answer"
+    assert ("prompt", LLM) in disk_cache._memory
+    clock.now += 40
+    assert disk_cache.lookup("prompt", LLM) is None
+
+
+def test_disk_tier_is_trimmed_to_the_most_recently_used(clock, tmp_path):
+    cache = TieredLLMCache(sqlite_path=str(tmp_path / "cache.sqlite3"), max_disk_entries=10)
+    for number in range(100):
+        clock.now += 1
+        cache.update(f"prompt {number}", LLM, response(str(number)))
+    cache._memory.clear()
+    rows = cache._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    assert rows == 10
+    assert cache.lookup("prompt 99", LLM) is not None
+    assert cache.lookup("prompt 0", LLM) is None
+    cache.close()
+
+
+def test_cached_responses_report_no_token_usage(clock, disk_cache):
+    original = response("answer")
+    disk_cache.update("prompt", LLM, original)
+    assert disk_cache.lookup("prompt", LLM)[0].message.usage_metadata is None
+    disk_cache._memory.clear()
+    assert disk_cache.lookup("prompt", LLM)[0].message.usage_metadata is None
+    # The caller's own response keeps its usage
+    assert original[0].message.usage_metadata == USAGE
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import time
+
+from app import llm_factory
+from app.llm_factory import GENERATION, aget_llm
+
+
+def test_aget_llm_waits_for_a_preload_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(llm_factory, "_models", {})
+    preloading = threading.Event()
+
+    def preload_holding_the_lock():
+        with llm_factory._lock:
+            preloading.set()
+            time.sleep(0.3)
+
+    async def run():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beating = asyncio.create_task(heartbeat())
+        model = await aget_llm(GENERATION)
+        beating.cancel()
+        return model, ticks
+
+    preload = threading.Thread(target=preload_holding_the_lock)
+    preload.start()
+    preloading.wait()
+    model, ticks = asyncio.run(run())
+    preload.join()
+    assert model is llm_factory._models[GENERATION]
+    # The loop kept running while the lock was held
+    assert ticks >= 10
@@ -0,0 +1,21 @@
+import asyncio
+
+from app.fake_llm import FakeChatModel
+from app.llm_metrics import TaskMetricsHandler
+from app.metrics import metrics
+from app.rate_limit import QueuedRateLimiter, track_admission
+
+
+def test_queue_wait_is_reported_apart_from_latency():
+    limiter = QueuedRateLimiter(requests_per_second=4, max_bucket_size=1, check_every_n_seconds=0.01)
+    model = FakeChatModel(latency=0.01, rate_limiter=limiter, callbacks=[TaskMetricsHandler("queued")])
+
+    async def run():
+        await limiter.aacquire()  # Drain the bucket so the call queues for ~0.25 s
+        track_admission()
+        await model.ainvoke("Ask one question for a Backend Developer")
+
+    asyncio.run(run())
+    assert metrics.get("queued_llm_calls") == 1
+    assert metrics.get("queued_llm_queue_ms") >= 150
+    assert metrics.get("queued_llm_latency_ms") < 100
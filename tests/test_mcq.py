@@ -0,0 +1,27 @@
+import pytest
+
+from app.mcq import AnswerWithholder, parse_mcq_text
+
+QUESTION = "Which structure gives O(1) average lookups?\nA) A list\nB) A hash map\nC) A linked list\nD) A heap\n"
+# Every answer line form parse_mcq_text accepts
+ANSWER_LINES = ["ANSWER: B", "Answer - B", "Answer : B", "answer:(b)", "ANSWER-B", "  Answer :  (B)", "ANSWER - b)"]
+
+
+def stream(text, chunk_size):
+    withholder = AnswerWithholder()
+    visible = [withholder.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    return "".join(visible) + withholder.flush()
+
+
+@pytest.mark.parametrize("answer_line", ANSWER_LINES)
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+def test_answer_line_is_withheld(answer_line, chunk_size):
+    text = QUESTION + answer_line + "\n"
+    assert parse_mcq_text(text).answer_key == "B"
+    assert stream(text, chunk_size) == QUESTION
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1000])
+def test_lines_starting_like_an_answer_are_released(chunk_size):
+    text = "Answer the following: which is fastest?\nA) An array\nB) Another list\nC) Answers\nD) A tree\nANSWER: A"
+    assert stream(text, chunk_size) == text[:text.index("ANSWER")]
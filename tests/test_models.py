@@ -0,0 +1,19 @@
+import pytest
+from pydantic import ValidationError
+
+from app.models import MCQItem
+
+OPTIONS = ["Use a mutex", "Use a queue", "Use a semaphore", "Use nothing"]
+
+
+@pytest.mark.parametrize("key, expected", [
+    ("B", "B"), ("b", "B"), (" (c) ", "C"), ("D.", "D"), ("a)", "A"), ("Answer: C", "C"), ("option b", "B"),
+])
+def test_answer_key_accepts_one_option_letter(key, expected):
+    assert MCQItem(stem="Which?", options=OPTIONS, answer_key=key).answer_key == expected
+
+
+@pytest.mark.parametrize("key", ["", "   ", "E", "AB", "Answer:", "Answer: E", "C) Use a semaphore"])
+def test_answer_key_rejects_anything_else(key):
+    with pytest.raises(ValidationError):
+        MCQItem(stem="Which?", options=OPTIONS, answer_key=key)
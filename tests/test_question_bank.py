@@ -0,0 +1,70 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.models import MCQItem
+from app.question_bank import QuestionBank
+
+JOB_TITLE, EXPERIENCE = "Backend Developer", "junior"
+
+
+def question(number: int) -> MCQItem:
+    return MCQItem(
+        stem=f"Question number {number}?",
+        options=["First", "Second", "Third", "Fourth"],
+        answer_key="ABCD"[number % 4],
+    )
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = QuestionBank(str(tmp_path / "bank.sqlite3"))
+    yield bank
+    bank.close()
+
+
+def test_stored_question_comes_back_with_its_answer_key(bank):
+    assert bank.add(JOB_TITLE, EXPERIENCE, question(1))
+    # Keys are normalized job title and experience
+    assert asyncio.run(bank.sample("  backend developer ", "Junior")) == question(1)
+
+
+def test_same_question_is_stored_once(bank):
+    assert bank.add(JOB_TITLE, EXPERIENCE, question(1))
+    assert not bank.add(JOB_TITLE, EXPERIENCE, question(1))
+    assert bank.add(JOB_TITLE, EXPERIENCE, question(2))
+    assert bank._count(bank._connection(), ("backend developer", "junior")) == 2
+
+
+def test_sample_skips_rejected_questions(bank):
+    bank.add(JOB_TITLE, EXPERIENCE, question(1))
+    assert asyncio.run(bank.sample(JOB_TITLE, EXPERIENCE, reject=lambda item: True)) is None
+    assert asyncio.run(bank.sample(JOB_TITLE, "senior")) is None
+
+
+def test_workers_sharing_the_file_keep_numbering_questions(bank):
+    other = QuestionBank(bank.path)
+    assert asyncio.run(other.sample(JOB_TITLE, EXPERIENCE)) is None  # `other` now caches a count of 0
+    bank.add(JOB_TITLE, EXPERIENCE, question(1))
+    bank.add(JOB_TITLE, EXPERIENCE, question(2))
+    # add re-reads the count under the write lock instead of trusting its cache
+    assert other.add(JOB_TITLE, EXPERIENCE, question(3))
+    rows = bank._connection().execute("SELECT seq FROM questions ORDER BY seq").fetchall()
+    assert [row[0] for row in rows] == [0, 1, 2]
+    other.close()
+
+
+def test_failed_write_is_rolled_back(bank):
+    def fail_write():
+        raise RuntimeError("disk full")
+
+    conn = bank._connection()
+    conn.create_function("fail_write", 0, fail_write)
+    conn.execute("CREATE TEMP TRIGGER fail BEFORE INSERT ON questions BEGIN SELECT fail_write(); END")
+    with pytest.raises(sqlite3.OperationalError):
+        bank.add(JOB_TITLE, EXPERIENCE, question(1))
+    assert not conn.in_transaction
+
+    conn.execute("DROP TRIGGER fail")
+    assert bank.add(JOB_TITLE, EXPERIENCE, question(1))
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from app.rate_limit import QueuedRateLimiter, RateLimitExceeded
+
+
+def empty_limiter(**kwargs) -> QueuedRateLimiter:
+    # The bucket starts empty, so every caller has to queue for a token
+    return QueuedRateLimiter(max_bucket_size=1, check_every_n_seconds=0.005, **kwargs)
+
+
+def test_callers_are_admitted_in_arrival_order():
+    limiter = empty_limiter(requests_per_second=50)
+    admitted = []
+
+    async def caller(name: str):
+        await limiter.aacquire()
+        admitted.append(name)
+
+    async def run():
+        tasks = []
+        for name in "abcd":
+            tasks.append(asyncio.create_task(caller(name)))
+            await asyncio.sleep(0.001)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert admitted == list("abcd")
+
+
+def test_non_blocking_caller_does_not_jump_the_queue():
+    limiter = empty_limiter(requests_per_second=20)
+
+    async def run():
+        queued = asyncio.create_task(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        skipped = limiter.acquire(blocking=False)
+        await queued
+        return skipped
+
+    assert asyncio.run(run()) is False
+
+
+def test_full_queue_is_rejected():
+    limiter = empty_limiter(requests_per_second=10, max_queue=1)
+
+    async def run():
+        queued = asyncio.create_task(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        with pytest.raises(RateLimitExceeded):
+            await limiter.aacquire()
+        await queued
+
+    asyncio.run(run())
+
+
+def test_wait_longer_than_allowed_is_rejected_up_front():
+    limiter = empty_limiter(requests_per_second=1, max_wait_seconds=0.1)
+    with pytest.raises(RateLimitExceeded) as raised:
+        asyncio.run(limiter.aacquire())
+    assert raised.value.retry_after > 0.1
+
+
+def test_low_quota_admits_once_the_bucket_has_refilled():
+    # One token every 0.5 s, but callers may only wait 0.3 s
+    limiter = empty_limiter(requests_per_second=2, max_wait_seconds=0.3)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+    time.sleep(0.25)
+    assert limiter.acquire()
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+
+from app.fake_llm import FakeChatModel
+from app.metrics import metrics
+from app.rate_limit import QueuedRateLimiter
+from app.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged
+
+PROMPT = "Ask one question for a Backend Developer"
+
+
+def tracker_with(seconds: float, samples: int = 20) -> LatencyTracker:
+    latencies = LatencyTracker(min_samples=samples)
+    for _ in range(samples):
+        latencies.record(seconds)
+    return latencies
+
+
+def test_no_hedge_while_queued_behind_the_rate_limiter():
+    limiter = QueuedRateLimiter(requests_per_second=4, max_bucket_size=1, check_every_n_seconds=0.01)
+    latencies = tracker_with(0.05)
+
+    async def call():
+        await limiter.aacquire()
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def run():
+        await limiter.aacquire()  # Drain the bucket so the call queues for ~0.25 s
+        return await hedged(call, latencies, percentile=95, min_delay=0.01)
+
+    hedges = metrics.get("hedges_sent")
+    assert asyncio.run(run()) == "done"
+    assert metrics.get("hedges_sent") == hedges
+    # The queue wait is not counted as provider latency
+    assert max(latencies._samples) < 0.1
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_circuit_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.02)
+    breaker.record_failure()
+    time.sleep(0.03)
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.02)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.03)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_cancelled_trial_lets_the_next_caller_try():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.02)
+    breaker.record_failure()
+    time.sleep(0.03)
+    breaker.before_call()
+    breaker.record_cancelled()
+    breaker.before_call()
+
+
+def test_slow_call_is_hedged_and_the_hedge_wins():
+    models = iter([FakeChatModel(latency=1.0), FakeChatModel(latency=0.01)])
+
+    async def call():
+        return await next(models).ainvoke(PROMPT)
+
+    hedges, wins = metrics.get("hedges_sent"), metrics.get("hedge_wins")
+    started = time.monotonic()
+    assert asyncio.run(hedged(call, tracker_with(0.02), percentile=95, min_delay=0.01)).content
+    assert time.monotonic() - started < 0.5
+    assert metrics.get("hedges_sent") == hedges + 1
+    assert metrics.get("hedge_wins") == wins + 1
+
+
+def test_no_hedge_before_enough_latencies_are_seen():
+    model = FakeChatModel(latency=0.1)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        return await model.ainvoke(PROMPT)
+
+    latencies = LatencyTracker(min_samples=20)
+    asyncio.run(hedged(call, latencies, percentile=95, min_delay=0.01))
+    assert calls == 1
+    assert len(latencies._samples) == 1
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.exceptions import ModelRateLimitError
+
+from app import llm_factory, services
+from app.config import CIRCUIT_RESET_SECONDS
+from app.fake_llm import FakeChatModel
+from app.llm_factory import GENERATION
+from app.resilience import CircuitBreaker
+from main import app
+
+CANDIDATE = {
+    "candidate_id": "c-1",
+    "candidate_name": "Ada",
+    "email": "ada@example.com",
+    "job_title": "Backend Developer",
+    "experience": "junior",
+}
+
+
+class QuotaExhaustedFakeChatModel(FakeChatModel):
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise ModelRateLimitError("quota exhausted")
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        raise ModelRateLimitError("quota exhausted")
+        yield
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_factory, "_models", {GENERATION: QuotaExhaustedFakeChatModel()})
+    monkeypatch.setitem(services.circuit_breakers, GENERATION, CircuitBreaker(failure_threshold=100))
+    return TestClient(app)
+
+
+def test_provider_quota_error_asks_the_client_to_retry(client):
+    response = client.post("/start", json=CANDIDATE)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(int(CIRCUIT_RESET_SECONDS))
+
+
+def test_provider_quota_error_is_a_retry_later_event(client):
+    response = client.post("/start/stream", json=CANDIDATE)
+    error = [block for block in response.text.split("\n\n") if block.startswith("event: error")]
+    data = json.loads(error[0].split("data: ", 1)[1])
+    assert data["status"] == 429
+    assert data["retry_after"] == int(CIRCUIT_RESET_SECONDS)
+
+
+def test_provider_quota_error_is_a_retry_later_socket_message(client):
+    with client.websocket_connect("/ws/interview") as socket:
+        socket.send_text(json.dumps({"type": "start", **CANDIDATE}))
+        message = socket.receive_json()
+    assert message["type"] == "error"
+    assert message["status"] == 429
+    assert message["retry_after"] == int(CIRCUIT_RESET_SECONDS)
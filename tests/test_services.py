@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from app import services
+from app import llm_factory
+from app.fake_llm import FakeChatModel
+from app.llm_factory import GENERATION, GRADING
+from app.mcq import describe_answer
+from app.models import MCQItem
+from app.resilience import CircuitBreaker, LatencyTracker
+from app.services import (
+    MessagesState,
+    agenerate_question_batch,
+    afind_unique_question,
+    ascore_and_provide_feedback,
+    atake_prefetched_question,
+    prefetch_pending,
+    record_question,
+    start_prefetch,
+)
+
+JOB_TITLE, EXPERIENCE = "Backend Developer", "junior"
+
+
+class MalformedFakeChatModel(FakeChatModel):
+    """Writes `malformed` questions with an answer key outside A-D before behaving normally."""
+
+    malformed: int = 1
+
+    def _question(self, prompt):
+        question = super()._question(prompt)
+        if self.malformed > 0:
+            self.malformed -= 1
+            question["answer_key"] = "E"
+        return question
+
+
+class RecordingFakeChatModel(FakeChatModel):
+    """Keeps the prompts it was sent."""
+
+    prompts: list = []
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append("\n".join(str(message.content) for message in messages))
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+class UnreachableFakeChatModel(FakeChatModel):
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise ConnectionError("provider unreachable")
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    monkeypatch.setitem(services.circuit_breakers, GENERATION, breaker)
+    return breaker
+
+
+def test_malformed_question_is_retried():
+    model = MalformedFakeChatModel(malformed=2)
+    question = asyncio.run(afind_unique_question(model, JOB_TITLE, EXPERIENCE, MessagesState()))
+    assert question.answer_key in "ABCD"
+    assert model.malformed == 0
+
+
+def test_concurrent_generation_is_not_coalesced():
+    model = FakeChatModel(latency=0.05)
+
+    async def generate_for_five_candidates():
+        return await asyncio.gather(*(
+            afind_unique_question(model, JOB_TITLE, EXPERIENCE, MessagesState()) for _ in range(5)
+        ))
+
+    questions = asyncio.run(generate_for_five_candidates())
+    assert len({question.render() for question in questions}) == 5
+
+
+def test_malformed_batch_yields_no_questions():
+    model = MalformedFakeChatModel()
+    assert asyncio.run(agenerate_question_batch(model, JOB_TITLE, EXPERIENCE, 3)) == []
+
+
+def test_malformed_output_does_not_open_the_circuit(breaker):
+    with pytest.raises(ValueError, match="unique question"):
+        asyncio.run(afind_unique_question(MalformedFakeChatModel(malformed=5), JOB_TITLE, EXPERIENCE, MessagesState()))
+    assert breaker.state == "closed"
+
+
+def test_provider_failures_open_the_circuit(breaker):
+    model = UnreachableFakeChatModel()
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            asyncio.run(services.agenerate_mcq(model, JOB_TITLE, EXPERIENCE))
+    assert breaker.state == "open"
+
+
+def test_grading_outage_leaves_generation_circuit_closed(monkeypatch, breaker):
+    grading_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    monkeypatch.setitem(services.circuit_breakers, GRADING, grading_breaker)
+    monkeypatch.setattr(llm_factory, "_models", {GRADING: UnreachableFakeChatModel()})
+    with pytest.raises(ConnectionError):
+        asyncio.run(services.agrade_answer("What is 2 + 2?", "4"))
+    assert grading_breaker.state == "open"
+    assert breaker.state == "closed"
+    assert asyncio.run(services.agenerate_mcq(FakeChatModel(), JOB_TITLE, EXPERIENCE)) is not None
+
+
+def test_latencies_are_tracked_per_task(monkeypatch):
+    trackers = {task: LatencyTracker(min_samples=1) for task in (GENERATION, GRADING)}
+    monkeypatch.setattr(services, "llm_latencies", trackers)
+    monkeypatch.setattr(services, "LLM_MAX_HEDGES", 1)  # Latencies are recorded by the hedging path
+    asyncio.run(services.agenerate_mcq(FakeChatModel(latency=0.05), JOB_TITLE, EXPERIENCE))
+    assert trackers[GENERATION].percentile(50) >= 0.05
+    assert trackers[GRADING].percentile(50) is None
+
+
+def test_late_prefetch_is_kept_for_the_next_turn():
+    state = MessagesState()
+
+    async def take_before_and_after_the_prefetch_lands():
+        start_prefetch(state, JOB_TITLE, EXPERIENCE, FakeChatModel(latency=0.2))
+        late = await atake_prefetched_question(state, JOB_TITLE, EXPERIENCE, timeout=0.01)
+        pending = prefetch_pending(state, JOB_TITLE, EXPERIENCE)
+        ready = await atake_prefetched_question(state, JOB_TITLE, EXPERIENCE)
+        return late, pending, ready
+
+    late, pending, ready = asyncio.run(take_before_and_after_the_prefetch_lands())
+    assert late is None
+    assert pending
+    assert ready is not None
+    assert state.prefetch_task is None
+
+
+@pytest.mark.parametrize("mode", ["per_item", "batched"])
+def test_llm_grading_of_an_ambiguous_answer_keeps_the_stored_key(monkeypatch, mode):
+    grader = RecordingFakeChatModel(prompts=[])
+    monkeypatch.setattr(llm_factory, "_models", {GRADING: grader})
+    item = MCQItem(
+        stem=f"Which data structure serves items first in, first out ({mode})?",
+        options=["Stack", "Queue", "Heap", "Trie"],
+        answer_key="B",
+    )
+    state = MessagesState()
+    record_question(state, item)
+    state.user_answers.append("the one where you line up")
+
+    feedback = asyncio.run(ascore_and_provide_feedback(state, mode=mode))
+    assert f"Correct Answer: {describe_answer(item)}" in grader.prompts[0]
+    assert feedback["details"][0]["correct_answer"] == describe_answer(item)
@@ -0,0 +1,70 @@
+from app.sessions import SessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class PendingTask:
+    """Stands in for a background grading task."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+def test_idle_session_expires_and_its_tasks_are_cancelled():
+    clock = Clock()
+    store = SessionStore(shards=4, ttl_seconds=60, clock=clock)
+    state = store.create("c-1")
+    task = state.grading_tasks[0] = PendingTask()
+    clock.now = 59
+    assert store.get("c-1") is state
+    # The access above restarted the idle timer
+    clock.now = 118
+    assert store.get("c-1") is state
+    clock.now = 178
+    assert store.get("c-1") is None
+    assert task.cancelled
+    assert len(store) == 0
+
+
+def test_new_session_replaces_the_old_one():
+    store = SessionStore(shards=4)
+    old = store.create("c-1")
+    task = old.grading_tasks[0] = PendingTask()
+    new = store.create("c-1")
+    assert new is not old
+    assert store.get("c-1") is new
+    assert task.cancelled
+    assert len(store) == 1
+
+
+def test_least_recently_used_session_is_evicted_at_capacity():
+    clock = Clock()
+    store = SessionStore(shards=1, max_sessions=2, clock=clock)
+    store.create("c-1")
+    clock.now = 1
+    store.create("c-2")
+    clock.now = 2
+    store.get("c-1")
+    clock.now = 3
+    store.create("c-3")
+    assert store.get("c-2") is None
+    assert store.get("c-1") is not None
+    assert store.get("c-3") is not None
+
+
+def test_expired_sessions_are_evicted_when_others_are_created():
+    clock = Clock()
+    store = SessionStore(shards=1, ttl_seconds=60, clock=clock)
+    store.create("c-1")
+    clock.now = 61
+    store.create("c-2")
+    assert len(store) == 1
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return calls
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", call) for _ in range(5)))
+
+    assert asyncio.run(run()) == [1] * 5
+    assert calls == 1
+    assert len(flight) == 0
+
+
+def test_call_survives_until_its_last_waiter_is_cancelled():
+    flight = SingleFlight()
+
+    async def run():
+        started = asyncio.Event()
+        done = []
+
+        async def call():
+            started.set()
+            await asyncio.sleep(0.05)
+            done.append(True)
+            return "result"
+
+        leaving = asyncio.create_task(flight.do("key", call))
+        staying = asyncio.create_task(flight.do("key", call))
+        await started.wait()
+        leaving.cancel()
+        result = await staying
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return result, done
+
+    assert asyncio.run(run()) == ("result", [True])
+
+
+def test_call_is_cancelled_with_its_last_waiter():
+    flight = SingleFlight()
+
+    async def run():
+        started = asyncio.Event()
+        cancelled = []
+
+        async def call():
+            started.set()
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        waiters = [asyncio.create_task(flight.do("key", call)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        return cancelled
+
+    assert asyncio.run(run()) == [True]
+    assert len(flight) == 0